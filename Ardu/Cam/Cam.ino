@@ -9,6 +9,7 @@ const char* password = "";
 // ===== Server =====
 const char* server_ip = "192.168.1.7";   // Pc IP
 const uint16_t server_port = 9876;
+const char* ws_path = "/cam/cam_01";     // unique id per camera
 
 WebSocketsClient webSocket;
 
@@ -68,7 +69,7 @@ void setup() {
   }
   Serial.println("\nWiFi Connected");
 
-  webSocket.begin(server_ip, server_port, "/");
+  webSocket.begin(server_ip, server_port, ws_path);
   webSocket.setReconnectInterval(3000);
 }
 
@@ -18,7 +18,7 @@ const char* password = "";
 /* ===== WebSocket ===== */
 const char* WS_HOST = "";
 const uint16_t WS_PORT = 8765;
-const char* WS_PATH = "/";
+const char* WS_PATH = "/door/door_01";   // unique id per door controller
 
 /* ===== Objects ===== */
 WebSocketsClient webSocket;
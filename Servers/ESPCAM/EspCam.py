@@ -1,189 +1,350 @@
 import asyncio
 import websockets
+import json
 import cv2
 import numpy as np
 import face_recognition
 import os
+import sys
 import time
-import base64
-import requests
+
+# Servers/ holds the helpers shared with the door server
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ws_paths import connection_path
+from face_matcher import FaceMatcher, MATCH_TOLERANCE
+from encoding_cache import EncodingCache, IMAGE_EXTS
+from recognition_worker import RecognitionPool, RECOGNITION_WORKERS
+from motion import MOTION_EVERY
+from event_sender import FaceEventSender
+from cameras import (
+    cameras, get_camera, parse_path, RecognitionScheduler
+)
 
 # ================= CONFIG =================
 HOST = "0.0.0.0"
 PORT = 9876
 
-PROCESS_EVERY = 5        # recognize every N frames
-EVENT_COOLDOWN = 5       # seconds between events for same person
-CAMERA_ID = "cam_01"
+EVENT_COOLDOWN = 5       # seconds between events for the same face track
+
+KNOWN_POLL_INTERVAL = 1.0   # seconds between known_faces/ scans
+STATS_INTERVAL = 30         # seconds between viewer / event metrics logs
+
+# False: relay the camera's JPEG untouched and send boxes as JSON metadata
+# True:  draw boxes into the frame (one decode + encode per frame with boxes)
+BURN_IN_BOXES = False
 
-FACE_EVENT_URL = "http://localhost:5000/api/face-event"
+# reuse the cached identity of trusted face tracks instead of re-encoding
+USE_TRACKER = True
+
+FACE_EVENTS_URL = "http://localhost:5000/api/face-events"   # batch endpoint
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 KNOWN_DIR = os.path.join(BASE_DIR, "known_faces")
-
-print(f"📂 Known faces dir: {KNOWN_DIR}")
+CACHE_DIR = os.path.join(BASE_DIR, "encoding_cache")
 
 # ================= GLOBALS =================
-clients = set()
-frame_id = 0
-last_faces = []
-last_sent = {}   # {name: timestamp}
+# per-camera state (frame counter, boxes, cooldowns, viewers) lives in cameras.py
+recognition_pool = None   # created in main(), workers re-import this file
+scheduler = None          # splits pool workers across cameras
+event_sender = None       # queued, batched delivery to mainServer
 
-known_face_encodings = []
-known_face_names = []
+matcher = FaceMatcher()   # swapped as a whole, never mutated in place
+encoding_cache = EncodingCache(CACHE_DIR)
 
 # ================= LOAD KNOWN FACES =================
-def load_known_faces():
-    global known_face_encodings, known_face_names
+def encode_known_face(path):
+    image = face_recognition.load_image_file(path)
+    encs = face_recognition.face_encodings(image)
+    return encs[0] if encs else None
 
-    known_face_encodings.clear()
-    known_face_names.clear()
+def load_known_faces():
+    global matcher
 
     if not os.path.isdir(KNOWN_DIR):
         print("⚠️ known_faces directory not found")
         return
 
-    for f in os.listdir(KNOWN_DIR):
-        if not f.lower().endswith((".jpg", ".png")):
-            continue
+    start = time.time()
+
+    # only new / changed images hit face_recognition, the rest come from the cache
+    encodings, names, files = encoding_cache.sync(KNOWN_DIR, encode_known_face)
+
+    matcher = FaceMatcher(encodings, names, files)
+    mode = "IVF" if matcher.index is not None else "exact"
+    print(
+        f"✅ Reloaded {len(matcher)} known faces ({mode} matcher) "
+        f"in {time.time() - start:.2f}s"
+    )
+
+# ================= KNOWN FACES WATCHER =================
+def scan_known_dir():
+    snapshot = {}
+    for entry in os.scandir(KNOWN_DIR):
+        if entry.name.lower().endswith(IMAGE_EXTS):
+            st = entry.stat()
+            snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+async def watch_known_faces():
+    # /api/add-known drops files into known_faces/ → encode just those and
+    # swap in an updated matcher; frames keep using the old one meanwhile
+    global matcher
+
+    loop = asyncio.get_running_loop()
+    snapshot = None
+
+    while True:
+        await asyncio.sleep(KNOWN_POLL_INTERVAL)
 
-        path = os.path.join(KNOWN_DIR, f)
         try:
-            image = face_recognition.load_image_file(path)
-            encs = face_recognition.face_encodings(image)
-            if encs:
-                known_face_encodings.append(encs[0])
-                name = os.path.splitext(f)[0].split("_")[0]
-                known_face_names.append(name)
-        except Exception as e:
-            print("❌ Failed loading face:", f, e)
+            if not os.path.isdir(KNOWN_DIR):
+                continue
+
+            current = await loop.run_in_executor(None, scan_known_dir)
+            if current == snapshot:
+                continue
+            snapshot = current
+
+            added, removed = await loop.run_in_executor(
+                None,
+                encoding_cache.changes,
+                KNOWN_DIR,
+                encode_known_face
+            )
+            if not added and not removed:
+                continue
+
+            matcher = matcher.updated(added, removed)
+            print(
+                f"🔄 Known faces updated: +{len(added)} -{len(removed)} "
+                f"→ {len(matcher)} total"
+            )
 
-    print(f"✅ Reloaded {len(known_face_names)} known faces")
+        except Exception as e:
+            print("❌ Known faces watcher error:", e)
 
-# تحميل أول مرة
-load_known_faces()
+# ================= RECOGNITION STAGE =================
+async def run_recognition(cam, roi):
+    # runs beside the ingest loop; boxes are swapped in when the pool answers
+    # tracks with a still-trusted identity are not re-encoded by the worker
+    trusted = cam.tracks.verified(time.time()) if USE_TRACKER else []
 
-# ================= SEND FACE EVENT =================
-def send_face_event(face_img, name):
     try:
-        _, jpg = cv2.imencode(
-            ".jpg",
-            face_img,
-            [int(cv2.IMWRITE_JPEG_QUALITY), 80]
+        locations, encodings, carried = await recognition_pool.recognize(
+            cam.slot,
+            roi,
+            [track.box for track in trusted]
+        )
+    except Exception as e:
+        print(f"❌ Recognition error ({cam.camera_id}):", e)
+        return
+    finally:
+        scheduler.finish()
+
+    now = time.time()
+
+    # nearest identity for every newly encoded face in one batched call
+    matches = iter(matcher.match(
+        [enc for enc in encodings if enc is not None],
+        tolerance=MATCH_TOLERANCE
+    ))
+
+    tracks = cam.tracks.update(
+        locations,
+        [trusted[c] if c >= 0 else None for c in carried],
+        now,
+        searched=roi
+    )
+
+    faces = []
+
+    for (t, r, b, l), enc, track in zip(locations, encodings, tracks):
+        if enc is not None:
+            name, distance = next(matches)
+            track.verify(name, distance, MATCH_TOLERANCE, now)
+
+        faces.append((t, r, b, l, track.name))
+
+        # ===== Send Event with per-track Cooldown =====
+        if track.event_due(now, EVENT_COOLDOWN):
+            face_crop = cam.slot.crop(t, r, b, l)
+            if face_crop.size != 0:
+                event_sender.submit(cam.camera_id, face_crop, track.name)
+                track.last_event = now
+
+    # HOG only looked inside the motion ROI: still faces elsewhere keep their box
+    for track in cam.tracks.unsearched(tracks, roi):
+        faces.append((*track.box, track.name))
+
+    cam.last_faces = faces
+    # burn-in mode draws the boxes into the JPEG; no JSON overlay on top
+    if not BURN_IN_BOXES:
+        publish_overlay(cam)
+
+def publish_overlay(cam):
+    overlay = json.dumps({
+        "type": "faces",
+        "camera": cam.camera_id,
+        "faces": [
+            {"box": [t, r, b, l], "name": name}
+            for (t, r, b, l, name) in cam.last_faces
+        ]
+    })
+
+    if overlay != cam.overlay:
+        cam.overlay = overlay
+        cam.viewers.publish(overlay, channel="faces")
+
+# ================= FRAME PIPELINE =================
+def decode(message):
+    return cv2.imdecode(
+        np.frombuffer(message, np.uint8),
+        cv2.IMREAD_COLOR
+    )
+
+def draw_boxes(frame, faces):
+    for (t, r, b, l, name) in faces:
+        cv2.rectangle(frame, (l, t), (r, b), (0, 255, 0), 2)
+        cv2.putText(
+            frame,
+            name,
+            (l, t - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            (0, 255, 0),
+            2
         )
 
-        payload = {
-            "camera_id": CAMERA_ID,
-            "name": name if name != "Unknown" else "UNKNOWN",
-            "status": "known" if name != "Unknown" else "unknown",
-            "image": base64.b64encode(jpg).decode()
-        }
+async def process_frame(cam, message):
+    cam.frame_id += 1
+    frame = None
+    now = time.time()
+
+    # ===== Motion Gate =====
+    # cheap 1/4-scale grey decode; recognition only runs on motion (or an
+    # occasional idle recheck), and HOG only scans the moving region
+    if cam.frame_id % MOTION_EVERY == 0:
+        cam.motion.update(message)
+
+    # ===== Face Recognition (worker pool) =====
+    # a camera denied a worker keeps asking on every frame until it gets one
+    # only frames that go to recognition are decoded in full
+    due = cam.motion.due(now) or scheduler.wants(cam)
+    if due and scheduler.try_start(cam):
+        frame = decode(message)
+        if frame is None:
+            scheduler.finish()
+            return
+
+        cam.slot.write(frame)   # copied before boxes are drawn
+        roi = cam.motion.take_roi(now)
+        cam.task = asyncio.create_task(run_recognition(cam, roi))
+
+    # ===== Passthrough =====
+    # the camera's own JPEG bytes, one immutable object shared by every send
+    if not BURN_IN_BOXES or not cam.last_faces:
+        cam.viewers.publish(bytes(message))
+        return
 
-        requests.post(FACE_EVENT_URL, json=payload, timeout=1)
+    # ===== Burn-in: decode / draw / encode once per frame =====
+    if frame is None:
+        frame = decode(message)
+        if frame is None:
+            return
+
+    draw_boxes(frame, cam.last_faces)
+
+    _, jpg = cv2.imencode(
+        ".jpg",
+        frame,
+        [int(cv2.IMWRITE_JPEG_QUALITY), 85]
+    )
+    cam.viewers.publish(jpg.tobytes())
+
+# ================= METRICS =================
+async def report_metrics():
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+
+        st = event_sender.stats()
+        print(
+            f"📨 face events: queued={st['queued']} sent={st['sent']} "
+            f"dropped={st['dropped']} retries={st['retries']} batches={st['batches']}"
+        )
 
-    except Exception as e:
-        print("❌ Failed to send face event:", e)
+        for cam in list(cameras.values()):
+            for addr, st in cam.viewers.stats():
+                print(
+                    f"📊 {cam.camera_id} → {addr}: sent={st['sent']} "
+                    f"dropped={st['dropped']} "
+                    f"latency avg={st['latency_avg_ms']}ms max={st['latency_max_ms']}ms"
+                )
 
 # ================= WEBSOCKET HANDLER =================
 async def handler(ws):
-    global frame_id, last_faces
+    role, camera_id = parse_path(connection_path(ws))
+    cam = get_camera(camera_id)
+
+    # legacy "/" clients watch the default camera until they send a frame
+    if role != "cam":
+        viewer = cam.viewers.add(ws)
+        if cam.overlay and not BURN_IN_BOXES:
+            viewer.offer(cam.overlay, channel="faces")   # late joiner gets boxes now
 
-    clients.add(ws)
-    print("[+] Client connected")
+    print(f"[+] {role or 'client'} connected ({camera_id})")
 
     try:
         async for message in ws:
-            if not isinstance(message, (bytes, bytearray)):
-                continue
-
-            frame = cv2.imdecode(
-                np.frombuffer(message, np.uint8),
-                cv2.IMREAD_COLOR
-            )
-            if frame is None:
+            if role == "view" or not isinstance(message, (bytes, bytearray)):
                 continue
 
-            frame_id += 1
-
-            # ===== Face Recognition =====
-            if frame_id % PROCESS_EVERY == 0:
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                locations = face_recognition.face_locations(rgb, model="hog")
-                encodings = face_recognition.face_encodings(rgb, locations)
-
-                last_faces = []
-
-                for (t, r, b, l), enc in zip(locations, encodings):
-                    name = "Unknown"
-
-                    if known_face_encodings:
-                        matches = face_recognition.compare_faces(
-                            known_face_encodings,
-                            enc,
-                            tolerance=0.55
-                        )
-                        if True in matches:
-                            name = known_face_names[matches.index(True)]
-
-                    last_faces.append((t, r, b, l, name))
-
-                    # ===== Send Event with Cooldown =====
-                    now = time.time()
-                    key = name
-
-                    if key not in last_sent or now - last_sent[key] > EVENT_COOLDOWN:
-                        face_crop = frame[t:b, l:r]
-                        if face_crop.size != 0:
-                            send_face_event(face_crop, name)
-                            last_sent[key] = now
-
-            # ===== Draw Boxes =====
-            for (t, r, b, l, name) in last_faces:
-                cv2.rectangle(frame, (l, t), (r, b), (0, 255, 0), 2)
-                cv2.putText(
-                    frame,
-                    name,
-                    (l, t - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (0, 255, 0),
-                    2
-                )
-
-            # ===== Encode Frame =====
-            _, jpg = cv2.imencode(
-                ".jpg",
-                frame,
-                [int(cv2.IMWRITE_JPEG_QUALITY), 85]
-            )
-
-            # ===== Broadcast (FIXED) =====
-            dead = []
+            if cam.source is not ws:
+                cam.viewers.discard(ws)   # never echo frames back to the camera
+                cam.source = ws
 
-            for c in list(clients):   # 🔥 IMPORTANT FIX
-                try:
-                    await c.send(jpg.tobytes())
-                except:
-                    dead.append(c)
-
-            for d in dead:
-                clients.discard(d)
+            await process_frame(cam, message)
 
     except websockets.exceptions.ConnectionClosed:
         pass
     finally:
-        clients.discard(ws)
-        print("[-] Client disconnected")
+        cam.viewers.discard(ws)
+        if cam.source is ws:
+            cam.source = None
+            scheduler.forget(cam)
+        print(f"[-] {role or 'client'} disconnected ({camera_id})")
 
 # ================= MAIN =================
 async def main():
+    global recognition_pool, scheduler, event_sender
+
+    recognition_pool = RecognitionPool(RECOGNITION_WORKERS)
+    scheduler = RecognitionScheduler(recognition_pool.workers)
+    event_sender = FaceEventSender(FACE_EVENTS_URL)
+    await recognition_pool.start()
+
     print(f"🚀 ESP CAM WS running on ws://{HOST}:{PORT}")
-    async with websockets.serve(
-        handler,
-        HOST,
-        PORT,
-        max_size=2**23
-    ):
-        await asyncio.Future()  # run forever
-
-asyncio.run(main())
+    asyncio.create_task(watch_known_faces())
+    asyncio.create_task(event_sender.run())
+    asyncio.create_task(report_metrics())
+
+    try:
+        async with websockets.serve(
+            handler,
+            HOST,
+            PORT,
+            max_size=2**23
+        ):
+            await asyncio.Future()  # run forever
+    finally:
+        recognition_pool.shutdown()
+        for cam in cameras.values():
+            cam.slot.release()
+
+if __name__ == "__main__":
+    print(f"📂 Known faces dir: {KNOWN_DIR}")
+
+    # تحميل أول مرة
+    load_known_faces()
+
+    asyncio.run(main())
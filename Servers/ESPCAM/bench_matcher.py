@@ -0,0 +1,59 @@
+import time
+import numpy as np
+
+from face_matcher import FaceMatcher
+
+# ================= CONFIG =================
+GALLERY_SIZES = [100, 1_000, 10_000]
+FACES_PER_FRAME = 3
+ROUNDS = 200
+
+rng = np.random.default_rng(42)
+
+
+def random_encodings(n):
+    # face_recognition encodings are roughly unit-norm 128-d vectors
+    enc = rng.normal(size=(n, 128)).astype(np.float32)
+    return enc / np.linalg.norm(enc, axis=1, keepdims=True) * 0.9
+
+
+# ================= OLD PATH =================
+# what compare_faces() did: list → array on every call, first match wins
+def linear_scan(known_list, names, enc, tolerance=0.55):
+    dist = np.linalg.norm(np.array(known_list) - enc, axis=1)
+    matches = list(dist <= tolerance)
+    return names[matches.index(True)] if True in matches else "Unknown"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    print(f"{'identities':>10} | {'linear ms':>9} | {'exact ms':>8} | {'ivf ms':>7} | ivf recall")
+    print("-" * 58)
+
+    for n in GALLERY_SIZES:
+        gallery = random_encodings(n)
+        names = [f"person{i}" for i in range(n)]
+        known_list = list(gallery.astype(np.float64))
+
+        # queries are noisy copies of enrolled faces
+        picks = rng.choice(n, FACES_PER_FRAME, replace=False)
+        frame = gallery[picks] + rng.normal(scale=0.02, size=(FACES_PER_FRAME, 128)).astype(np.float32)
+
+        exact = FaceMatcher(gallery, names, ivf_threshold=n + 1)
+        ivf = FaceMatcher(gallery, names, ivf_threshold=0)
+
+        t_linear = timed(lambda: [linear_scan(known_list, names, e) for e in frame])
+        t_exact = timed(lambda: exact.match(frame))
+        t_ivf = timed(lambda: ivf.match(frame))
+
+        expected = [names[p] for p in picks]
+        hits = sum(a == b for (a, _), b in zip(ivf.match(frame), expected))
+
+        print(f"{n:>10} | {t_linear:>9.3f} | {t_exact:>8.3f} | {t_ivf:>7.3f} | {hits}/{FACES_PER_FRAME}")
@@ -0,0 +1,50 @@
+from cameras import RecognitionScheduler, WAIT_STALE
+
+# ================= CONFIG =================
+# python bench_scheduler.py
+#   one worker shared by two cameras on a simulated clock: cam_stall gets
+#   queued and then stops sending frames, cam_live keeps asking every frame.
+#   cam_live must get the worker back once cam_stall has gone quiet.
+FRAME_INTERVAL = 0.05      # seconds between frames of the live camera
+RECOGNITION_TIME = 0.1     # seconds one recognition holds the worker
+DURATION = 5.0
+
+
+class FakeCamera:
+    def __init__(self, camera_id):
+        self.camera_id = camera_id
+        self.busy_until = 0.0
+        self.now = 0.0
+
+    @property
+    def busy(self):
+        return self.now < self.busy_until
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    scheduler = RecognitionScheduler(workers=1)
+    live, stall = FakeCamera("cam_live"), FakeCamera("cam_stall")
+
+    # cam_live holds the worker, cam_stall asks once (queued) and stalls
+    assert scheduler.try_start(live, now=0.0)
+    live.busy_until = RECOGNITION_TIME
+    assert not scheduler.try_start(stall, now=0.01)
+
+    grants, first_grant, now = 0, None, FRAME_INTERVAL
+    while now < DURATION:
+        live.now = now
+        if scheduler.in_flight and not live.busy:
+            scheduler.finish()
+        if scheduler.try_start(live, now=now):
+            grants += 1
+            first_grant = first_grant or now
+            live.busy_until = now + RECOGNITION_TIME
+        now += FRAME_INTERVAL
+
+    print(
+        f"cam_live: {grants} recognitions in {DURATION:.0f} s, first after the stall at "
+        f"{first_grant if first_grant is None else round(first_grant, 2)} s "
+        f"(WAIT_STALE {WAIT_STALE} s); cam_stall still queued: {scheduler.wants(stall)}"
+    )
+    assert grants > 0 and not scheduler.wants(stall), "stalled camera kept the worker"
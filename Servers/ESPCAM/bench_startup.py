@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+
+from encoding_cache import EncodingCache
+
+# ================= CONFIG =================
+# python bench_startup.py [known_faces_dir]
+#   with a directory: real face_recognition encoding of a temporary copy
+#                     of those images (the live gallery is never written)
+#   without:          SYNTHETIC_IMAGES fake files, SYNTHETIC_COST s per encode
+SYNTHETIC_IMAGES = 500
+SYNTHETIC_COST = 0.05   # ≈ one HOG face_encodings() call on a small crop
+
+
+def real_encoder():
+    import face_recognition
+
+    def encode(path):
+        image = face_recognition.load_image_file(path)
+        encs = face_recognition.face_encodings(image)
+        return encs[0] if encs else None
+
+    return encode
+
+
+def synthetic_dir(n):
+    path = tempfile.mkdtemp(prefix="known_faces_")
+    for i in range(n):
+        with open(os.path.join(path, f"person{i}_1.jpg"), "wb") as f:
+            f.write(os.urandom(20_000))
+    return path
+
+
+def synthetic_encode(path):
+    time.sleep(SYNTHETIC_COST)
+    seed = int.from_bytes(open(path, "rb").read(8), "little")
+    return np.random.default_rng(seed).normal(size=128).astype(np.float32)
+
+
+def startup(image_dir, cache_dir, encode):
+    calls = 0
+
+    def counting(path):
+        nonlocal calls
+        calls += 1
+        return encode(path)
+
+    start = time.perf_counter()
+    matrix, names, _ = EncodingCache(cache_dir).sync(image_dir, counting)
+    return time.perf_counter() - start, len(names), calls
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # the incremental step adds a file; EspCam's watcher must never see it
+        image_dir, encode = tempfile.mkdtemp(prefix="known_faces_"), real_encoder()
+        shutil.copytree(sys.argv[1], image_dir, dirs_exist_ok=True)
+    else:
+        image_dir, encode = synthetic_dir(SYNTHETIC_IMAGES), synthetic_encode
+
+    cache_dir = tempfile.mkdtemp(prefix="encoding_cache_")
+
+    try:
+        cold = startup(image_dir, cache_dir, encode)
+        warm = startup(image_dir, cache_dir, encode)
+
+        # one new enrollment on top of a warm cache
+        src = sorted(f for f in os.listdir(image_dir) if f.lower().endswith((".jpg", ".png")))[0]
+        added = os.path.join(image_dir, "benchnew_1" + os.path.splitext(src)[1])
+        with open(os.path.join(image_dir, src), "rb") as f:
+            data = bytearray(f.read())
+        data[-1] ^= 0xFF   # different content → new hash
+        with open(added, "wb") as f:
+            f.write(data)
+        incremental = startup(image_dir, cache_dir, encode)
+
+        print(f"{'startup':>12} | {'seconds':>8} | {'faces':>6} | encodes")
+        print("-" * 44)
+        for label, (secs, faces, calls) in (
+            ("cold cache", cold), ("warm cache", warm), ("warm + 1 new", incremental)
+        ):
+            print(f"{label:>12} | {secs:>8.3f} | {faces:>6} | {calls}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        shutil.rmtree(image_dir, ignore_errors=True)
@@ -0,0 +1,98 @@
+import time
+
+from recognition_worker import FrameSlot
+from fanout import Fanout
+from motion import MotionDetector
+from tracking import TrackSet
+
+# ================= CONFIG =================
+DEFAULT_CAMERA_ID = "cam_01"   # used by clients connecting on plain "/"
+WAIT_STALE = 1.0               # seconds a queued camera may go without asking again
+
+
+# ================= HANDSHAKE =================
+def parse_path(path):
+    """
+    "/cam/<id>"  → ("cam", id)    ESP32-CAM pushing JPEG frames
+    "/view/<id>" → ("view", id)   dashboard watching one camera
+    "/"          → (None, DEFAULT_CAMERA_ID)  legacy: viewer until it sends a frame
+    """
+    parts = path.split("?")[0].strip("/").split("/")
+    role = parts[0] if parts[0] in ("cam", "view") else None
+    camera_id = parts[1] if role and len(parts) > 1 and parts[1] else DEFAULT_CAMERA_ID
+    return role, camera_id
+
+
+# ================= CAMERA STATE =================
+class CameraState:
+    """Everything one ESP32-CAM's pipeline owns: counters, boxes, cooldowns, viewers."""
+
+    def __init__(self, camera_id):
+        self.camera_id = camera_id
+        self.frame_id = 0
+        self.last_faces = []         # [(t, r, b, l, name)] drawn / sent to viewers
+        self.overlay = None          # last "faces" JSON sent to viewers
+        self.tracks = TrackSet()     # identities + event cooldowns per face track
+        self.viewers = Fanout()      # latest-frame-wins mailbox per viewer
+        self.source = None           # camera websocket, if connected
+        self.slot = FrameSlot()      # shared-memory frame for the pool
+        self.task = None             # in-flight recognition
+        self.motion = MotionDetector()
+
+    @property
+    def busy(self):
+        return self.task is not None and not self.task.done()
+
+
+cameras = {}
+
+
+def get_camera(camera_id):
+    cam = cameras.get(camera_id)
+    if cam is None:
+        cam = cameras[camera_id] = CameraState(camera_id)
+        print(f"📷 New camera: {camera_id}")
+    return cam
+
+
+# ================= SCHEDULER =================
+class RecognitionScheduler:
+    """
+    Shares the pool's workers between cameras. A camera that asks while every
+    worker is busy is queued; freed workers go to the queue head first, so
+    cameras are served round-robin and each gets ~workers/cameras of the budget.
+    A queued camera that stops asking (stalled feed) loses its place after
+    WAIT_STALE instead of holding the head.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.in_flight = 0
+        self.waiting = {}   # camera_id → last ask (monotonic), insertion order = queue order
+
+    def wants(self, cam):
+        return cam.camera_id in self.waiting
+
+    def try_start(self, cam, now=None):
+        if cam.busy:
+            return False
+
+        now = time.monotonic() if now is None else now
+        for camera_id, asked in list(self.waiting.items()):
+            if camera_id != cam.camera_id and now - asked > WAIT_STALE:
+                del self.waiting[camera_id]
+
+        head = next(iter(self.waiting), cam.camera_id)
+        if self.in_flight >= self.workers or head != cam.camera_id:
+            self.waiting[cam.camera_id] = now   # an update keeps its queue position
+            return False
+
+        self.waiting.pop(cam.camera_id, None)
+        self.in_flight += 1
+        return True
+
+    def finish(self):
+        self.in_flight -= 1
+
+    def forget(self, cam):
+        self.waiting.pop(cam.camera_id, None)
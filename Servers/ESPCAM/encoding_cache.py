@@ -0,0 +1,250 @@
+import os
+import json
+import glob
+import time
+import hashlib
+import numpy as np
+
+from face_matcher import ENCODING_DIM
+
+# ================= CONFIG =================
+IMAGE_EXTS = (".jpg", ".png")
+MANIFEST_FILE = "manifest.json"
+MATRIX_PATTERN = "encodings-*.npy"
+
+
+# ================= HELPERS =================
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def name_from_file(filename):
+    # "Andrew_3.jpg" → "Andrew"
+    return os.path.splitext(filename)[0].split("_")[0]
+
+
+def _empty_matrix():
+    return np.zeros((0, ENCODING_DIM), dtype=np.float32)
+
+
+def _atomic_write(path, write):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+# ================= ENCODING CACHE =================
+class EncodingCache:
+    """
+    On-disk store of face encodings keyed by image content (sha1).
+
+    encodings-<gen>.npy  float32 (N, 128), loaded with mmap_mode="r"
+    manifest.json        {"matrix", "files": {filename: mtime/size/sha1}, "rows": {sha1: row}}
+
+    A row of -1 means the image was encoded but had no face, so it is not retried.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.files = {}
+        self.rows = {}
+        self.matrix = _empty_matrix()
+        self.matrix_file = None
+        self.current = {}
+        self._dirty = False
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    # ---------- persistence ----------
+    def _load(self):
+        path = os.path.join(self.cache_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path, "r") as f:
+                manifest = json.load(f)
+
+            matrix = _empty_matrix()
+            if manifest["matrix"]:
+                matrix = np.load(
+                    os.path.join(self.cache_dir, manifest["matrix"]),
+                    mmap_mode="r"
+                )
+
+            self.files = manifest["files"]
+            self.rows = manifest["rows"]
+            self.matrix = matrix
+            self.matrix_file = manifest["matrix"]
+        except Exception as e:
+            print("⚠️ Encoding cache unreadable, rebuilding:", e)
+            self.files, self.rows = {}, {}
+            self.matrix, self.matrix_file = _empty_matrix(), None
+
+    def save(self):
+        if not self._dirty:
+            return
+
+        # compaction: keep only rows still referenced by a file
+        live = {meta["sha1"] for meta in self.files.values()}
+        keep = sorted(
+            (row, sha1) for sha1, row in self.rows.items()
+            if sha1 in live and row >= 0
+        )
+        matrix = np.ascontiguousarray(
+            self.matrix[[row for row, _ in keep]], dtype=np.float32
+        ) if keep else _empty_matrix()
+
+        rows = {sha1: i for i, (_, sha1) in enumerate(keep)}
+        rows.update({
+            sha1: -1 for sha1, row in self.rows.items()
+            if sha1 in live and row < 0
+        })
+
+        # new generation file, so a still-mapped old one is never overwritten
+        matrix_file = None
+        if len(matrix):
+            matrix_file = f"encodings-{time.time_ns()}.npy"
+            _atomic_write(
+                os.path.join(self.cache_dir, matrix_file),
+                lambda f: np.save(f, matrix)
+            )
+
+        manifest = {"matrix": matrix_file, "files": self.files, "rows": rows}
+        _atomic_write(
+            os.path.join(self.cache_dir, MANIFEST_FILE),
+            lambda f: f.write(json.dumps(manifest).encode())
+        )
+
+        self.rows = rows
+        self.matrix = matrix
+        self.matrix_file = matrix_file
+        self._dirty = False
+
+        for old in glob.glob(os.path.join(self.cache_dir, MATRIX_PATTERN)):
+            if os.path.basename(old) == matrix_file:
+                continue
+            try:
+                os.remove(old)
+            except OSError:
+                pass   # still mapped somewhere (Windows), next save retries
+
+    # ---------- lookups ----------
+    def digest(self, path, filename):
+        st = os.stat(path)
+        meta = self.files.get(filename)
+
+        # unchanged mtime + size → trust the stored hash, skip reading the file
+        if meta and meta["mtime"] == st.st_mtime_ns and meta["size"] == st.st_size:
+            return meta["sha1"]
+
+        sha1 = file_digest(path)
+        self.files[filename] = {
+            "mtime": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha1": sha1
+        }
+        self._dirty = True
+        return sha1
+
+    def _append(self, pending):
+        found = [(sha1, enc) for sha1, enc in pending.items() if enc is not None]
+
+        for sha1, enc in pending.items():
+            if enc is None:
+                self.rows[sha1] = -1
+
+        if found:
+            start = len(self.matrix)
+            new = np.asarray([enc for _, enc in found], dtype=np.float32)
+            self.matrix = np.concatenate([self.matrix, new.reshape(-1, ENCODING_DIM)])
+            for i, (sha1, _) in enumerate(found):
+                self.rows[sha1] = start + i
+
+        self._dirty = True
+
+    # ---------- sync ----------
+    def _scan(self, image_dir, encode):
+        listing = sorted(
+            f for f in os.listdir(image_dir)
+            if f.lower().endswith(IMAGE_EXTS)
+        )
+
+        pending = {}
+        for f in listing:
+            path = os.path.join(image_dir, f)
+            try:
+                sha1 = self.digest(path, f)
+                if sha1 not in self.rows and sha1 not in pending:
+                    pending[sha1] = encode(path)
+            except Exception as e:
+                print("❌ Failed loading face:", f, e)
+                self.files.pop(f, None)
+
+        listed = set(listing)
+        for f in list(self.files):
+            if f not in listed:
+                del self.files[f]
+                self._dirty = True
+
+        if pending:
+            self._append(pending)
+
+        self.save()
+
+        # {filename: sha1} of what the gallery should contain now
+        self.current = {
+            f: self.files[f]["sha1"] for f in listing if f in self.files
+        }
+        return listing
+
+    def sync(self, image_dir, encode):
+        """
+        Bring the cache in line with image_dir, calling encode(path) only for
+        content it has never seen. Returns (matrix, names, filenames).
+        """
+        listing = self._scan(image_dir, encode)
+
+        rows, names, filenames = [], [], []
+        for f in listing:
+            row = self.rows.get(self.current.get(f), -1)
+            if row >= 0:
+                rows.append(row)
+                names.append(name_from_file(f))
+                filenames.append(f)
+
+        # every row used in order → hand out the mapped matrix itself, no copy
+        if rows == list(range(len(self.matrix))):
+            return self.matrix, names, filenames
+
+        return self.matrix[rows], names, filenames
+
+    def changes(self, image_dir, encode):
+        """
+        Rescan image_dir against the previous scan. Returns
+        (added [(filename, name, encoding)], removed [filename]).
+        A rename is a remove + an add of already-cached content: no encoding.
+        """
+        previous = self.current
+        self._scan(image_dir, encode)
+
+        removed = [
+            f for f, sha1 in previous.items()
+            if self.current.get(f) != sha1
+        ]
+
+        added = []
+        for f, sha1 in self.current.items():
+            if previous.get(f) == sha1:
+                continue
+            row = self.rows.get(sha1, -1)
+            if row >= 0:
+                added.append((f, name_from_file(f), np.array(self.matrix[row])))
+
+        return added, removed
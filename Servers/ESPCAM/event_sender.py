@@ -0,0 +1,137 @@
+import json
+import base64
+import asyncio
+import cv2
+import requests
+from requests.adapters import HTTPAdapter
+
+# ================= CONFIG =================
+EVENT_QUEUE_SIZE = 100     # oldest events are dropped past this
+EVENT_BATCH_SIZE = 8       # events per request
+EVENT_BATCH_WAIT = 0.05    # seconds to wait for a batch to fill up
+EVENT_RETRIES = 3
+EVENT_BACKOFF = 0.5        # seconds, doubled per retry
+EVENT_TIMEOUT = 2
+EVENT_FORMAT = "multipart"   # "multipart" (raw JPEG parts) or "json" (base64)
+
+
+# ================= SENDER =================
+class FaceEventSender:
+    """
+    Outbound face events: a bounded asyncio queue drained by one task that
+    batches events and posts them over a keep-alive session from a worker
+    thread, retrying with backoff. submit() never blocks the event loop.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.queue = asyncio.Queue(EVENT_QUEUE_SIZE)
+
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        self.sent = 0
+        self.dropped = 0
+        self.retries = 0
+        self.batches = 0
+
+    def submit(self, camera_id, face_img, name):
+        if self.queue.full():
+            self.queue.get_nowait()   # newest events matter most
+            self.dropped += 1
+
+        self.queue.put_nowait({
+            "camera_id": camera_id,
+            "name": name if name != "Unknown" else "UNKNOWN",
+            "status": "known" if name != "Unknown" else "unknown",
+            "crop": face_img
+        })
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + EVENT_BATCH_WAIT
+
+            while len(batch) < EVENT_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._deliver(batch)
+
+    async def _deliver(self, batch):
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(EVENT_RETRIES + 1):
+            try:
+                refused = await loop.run_in_executor(None, self._post, batch)
+            except Exception as e:
+                refused, error = range(len(batch)), e
+            else:
+                self.sent += len(batch) - len(refused)
+                self.batches += 1
+                error = "server busy"
+
+            if not refused:
+                return
+
+            # only what the server didn't take goes round again
+            batch = [batch[i] for i in refused]
+            if attempt == EVENT_RETRIES:
+                print(f"❌ Failed to send {len(batch)} face event(s):", error)
+                self.dropped += len(batch)
+                return
+            self.retries += 1
+            await asyncio.sleep(EVENT_BACKOFF * 2 ** attempt)
+
+    def _post(self, batch):
+        # runs in a worker thread; JPEGs are encoded once, reused on retry.
+        # Returns the indices of events the server refused (writer pool full)
+        for event in batch:
+            if "jpg" not in event:
+                _, jpg = cv2.imencode(
+                    ".jpg",
+                    event.pop("crop"),
+                    [int(cv2.IMWRITE_JPEG_QUALITY), 80]
+                )
+                event["jpg"] = jpg.tobytes()
+
+        meta = [
+            {k: event[k] for k in ("camera_id", "name", "status")}
+            for event in batch
+        ]
+
+        if EVENT_FORMAT == "multipart":
+            for i, m in enumerate(meta):
+                m["image"] = f"img{i}"
+            r = self.session.post(
+                self.url,
+                data={"events": json.dumps(meta)},
+                files={
+                    f"img{i}": (f"img{i}.jpg", event["jpg"], "image/jpeg")
+                    for i, event in enumerate(batch)
+                },
+                timeout=EVENT_TIMEOUT
+            )
+        else:
+            for m, event in zip(meta, batch):
+                m["image"] = base64.b64encode(event["jpg"]).decode()
+            r = self.session.post(self.url, json=meta, timeout=EVENT_TIMEOUT)
+
+        r.raise_for_status()
+        return r.json().get("refused", [])
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "batches": self.batches
+        }
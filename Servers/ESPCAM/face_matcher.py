@@ -0,0 +1,157 @@
+import numpy as np
+
+# ================= CONFIG =================
+MATCH_TOLERANCE = 0.55   # same threshold face_recognition.compare_faces used
+IVF_THRESHOLD = 2000     # switch to the approximate index above this gallery size
+IVF_PROBE = 4            # how many partitions to scan per query
+IVF_ITERATIONS = 8       # k-means rounds when building the partitions
+
+ENCODING_DIM = 128
+
+
+# ================= HELPERS =================
+def _as_matrix(encodings):
+    matrix = np.asarray(encodings, dtype=np.float32)
+    return np.ascontiguousarray(matrix.reshape(-1, ENCODING_DIM))
+
+
+def _sq_norms(matrix):
+    return np.einsum("ij,ij->i", matrix, matrix)
+
+
+def _pairwise_distances(queries, q_norms, matrix, m_norms):
+    # ||q - m||² = ||q||² + ||m||² - 2 q·m  → one GEMM for the whole batch
+    d2 = q_norms[:, None] + m_norms[None, :] - 2.0 * (queries @ matrix.T)
+    np.maximum(d2, 0.0, out=d2)
+    return np.sqrt(d2, out=d2)
+
+
+# ================= IVF INDEX =================
+class IVFIndex:
+    """Inverted-file index: k-means partitions, only the closest few are scanned."""
+
+    def __init__(self, matrix, n_probe=IVF_PROBE, iterations=IVF_ITERATIONS,
+                 seed=0, centroids=None):
+        n = len(matrix)
+        m_norms = _sq_norms(matrix)
+
+        # reusing centroids (incremental updates) skips k-means entirely
+        if centroids is not None:
+            iterations = 0
+        else:
+            rng = np.random.default_rng(seed)
+            centroids = matrix[rng.choice(n, max(1, int(np.sqrt(n))), replace=False)]
+
+        centroids = np.array(centroids, dtype=np.float32)
+        n_lists = len(centroids)
+
+        for _ in range(iterations):
+            assign = self._assign(matrix, m_norms, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, matrix)
+            counts = np.bincount(assign, minlength=n_lists).astype(np.float32)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        assign = self._assign(matrix, m_norms, centroids)
+
+        # rows grouped by partition: list k lives in order[offsets[k]:offsets[k + 1]]
+        self.order = np.argsort(assign, kind="stable")
+        self.offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(assign, minlength=n_lists)))
+        )
+        self.centroids = centroids
+        self.c_norms = _sq_norms(centroids)
+        self.n_probe = min(n_probe, n_lists)
+
+    @staticmethod
+    def _assign(matrix, m_norms, centroids):
+        dist = _pairwise_distances(matrix, m_norms, centroids, _sq_norms(centroids))
+        return np.argmin(dist, axis=1)
+
+    def candidates(self, queries, q_norms):
+        dist = _pairwise_distances(queries, q_norms, self.centroids, self.c_norms)
+        probes = np.argpartition(dist, self.n_probe - 1, axis=1)[:, :self.n_probe]
+
+        for row in probes:
+            yield np.concatenate([
+                self.order[self.offsets[k]:self.offsets[k + 1]] for k in row
+            ])
+
+
+# ================= MATCHER =================
+class FaceMatcher:
+    """Immutable gallery of known encodings held as one float32 matrix."""
+
+    def __init__(self, encodings=(), names=(), files=None,
+                 ivf_threshold=IVF_THRESHOLD, centroids=None):
+        self.names = list(names)
+        self.files = list(files) if files is not None else [None] * len(self.names)
+        self.matrix = _as_matrix(encodings)
+        self.sq_norms = _sq_norms(self.matrix)
+        self.ivf_threshold = ivf_threshold
+
+        if not len(self.names) == len(self.files) == len(self.matrix):
+            raise ValueError("encodings, names and files must have the same length")
+
+        self.index = None
+        if len(self.names) > ivf_threshold:
+            self.index = IVFIndex(self.matrix, centroids=centroids)
+
+    def __len__(self):
+        return len(self.names)
+
+    def updated(self, added=(), removed=()):
+        """
+        New matcher with rows of `removed` files dropped and `added`
+        (filename, name, encoding) appended. Existing IVF centroids are kept,
+        so an update costs one assignment pass instead of a k-means rebuild.
+        """
+        gone = set(removed) | {f for f, _, _ in added}
+        keep = [i for i, f in enumerate(self.files) if f not in gone]
+
+        matrix = np.concatenate([
+            self.matrix[keep],
+            _as_matrix([enc for _, _, enc in added])
+        ])
+        names = [self.names[i] for i in keep] + [name for _, name, _ in added]
+        files = [self.files[i] for i in keep] + [f for f, _, _ in added]
+
+        centroids = self.index.centroids if self.index is not None else None
+        return FaceMatcher(matrix, names, files, self.ivf_threshold, centroids)
+
+    def nearest(self, encodings):
+        """Return (row, distance) of the closest gallery entry for every query."""
+        queries = _as_matrix(encodings)
+        if not len(queries) or not len(self):
+            return [(-1, float("inf"))] * len(queries)
+
+        q_norms = _sq_norms(queries)
+
+        if self.index is None:
+            dist = _pairwise_distances(queries, q_norms, self.matrix, self.sq_norms)
+            rows = np.argmin(dist, axis=1)
+            return [
+                (int(r), float(dist[i, r])) for i, r in enumerate(rows)
+            ]
+
+        results = []
+        for i, cand in enumerate(self.index.candidates(queries, q_norms)):
+            if not len(cand):
+                # probed clusters emptied by updated() removals: scan everything
+                cand = np.arange(len(self))
+            dist = _pairwise_distances(
+                queries[i:i + 1], q_norms[i:i + 1],
+                self.matrix[cand], self.sq_norms[cand]
+            )[0]
+            best = int(np.argmin(dist))
+            results.append((int(cand[best]), float(dist[best])))
+        return results
+
+    def match(self, encodings, tolerance=MATCH_TOLERANCE):
+        """Return (name, distance) per query; "Unknown" when nothing is close enough."""
+        results = []
+        for row, distance in self.nearest(encodings):
+            name = self.names[row] if row >= 0 and distance <= tolerance else "Unknown"
+            results.append((name, distance))
+        return results
@@ -0,0 +1,115 @@
+import time
+import asyncio
+
+# ================= CONFIG =================
+LATENCY_ALPHA = 0.1   # smoothing for the per-viewer latency average
+CHANNELS = ("faces", "frame")   # send order when both are waiting
+
+
+# ================= VIEWER =================
+class Viewer:
+    """
+    One dashboard connection with a single-slot mailbox per channel: a new
+    frame (or overlay) replaces an unsent one, so a slow link only ever lags
+    by one frame and never holds up the camera or others. Only replaced
+    frames count as dropped; replaced overlays are counted on their own.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.pending = {}              # channel → (payload, enqueued_at)
+        self.ready = asyncio.Event()
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0               # video frames replaced before they were sent
+        self.overlays_replaced = 0
+        self.latency_avg = 0.0         # enqueue → send complete, seconds
+        self.latency_max = 0.0
+
+        self.task = asyncio.create_task(self._pump())
+
+    def offer(self, payload, channel="frame"):
+        # payload is shared between viewers as-is (immutable bytes / str)
+        if channel in self.pending:
+            if channel == "frame":
+                self.dropped += 1
+            else:
+                self.overlays_replaced += 1
+        self.pending[channel] = (payload, time.perf_counter())
+        self.ready.set()
+
+    async def _pump(self):
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+
+                pending, self.pending = self.pending, {}
+
+                for channel in CHANNELS:
+                    if channel not in pending:
+                        continue
+
+                    payload, enqueued = pending[channel]
+                    await self.ws.send(payload)
+
+                    if channel == "frame":
+                        latency = time.perf_counter() - enqueued
+                        self.sent += 1
+                        self.latency_max = max(self.latency_max, latency)
+                        self.latency_avg += LATENCY_ALPHA * (latency - self.latency_avg)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.closed = True   # connection gone; the handler cleans up
+
+    def close(self):
+        self.closed = True
+        self.task.cancel()
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "overlays_replaced": self.overlays_replaced,
+            "latency_avg_ms": round(self.latency_avg * 1000, 1),
+            "latency_max_ms": round(self.latency_max * 1000, 1)
+        }
+
+
+# ================= FAN-OUT =================
+class Fanout:
+    """Per-camera set of viewers; publish() never awaits a network send."""
+
+    def __init__(self):
+        self.viewers = {}   # ws → Viewer
+
+    def __len__(self):
+        return len(self.viewers)
+
+    def __contains__(self, ws):
+        return ws in self.viewers
+
+    def add(self, ws):
+        if ws not in self.viewers:
+            self.viewers[ws] = Viewer(ws)
+        return self.viewers[ws]
+
+    def discard(self, ws):
+        viewer = self.viewers.pop(ws, None)
+        if viewer is not None:
+            viewer.close()
+
+    def publish(self, payload, channel="frame"):
+        for ws, viewer in list(self.viewers.items()):
+            if viewer.closed:
+                self.discard(ws)
+            else:
+                viewer.offer(payload, channel)
+
+    def stats(self):
+        return [
+            (getattr(ws, "remote_address", None), viewer.stats())
+            for ws, viewer in self.viewers.items()
+        ]
@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+
+# ================= CONFIG =================
+MOTION_EVERY = 2           # run the motion check on every Nth frame
+MOTION_DECODE = cv2.IMREAD_REDUCED_GRAYSCALE_4   # JPEG decoded at 1/4 size, grey
+MOTION_SCALE = 4
+MOTION_THRESHOLD = 25      # grey-level change that counts as moving
+MOTION_MIN_AREA = 0.002    # fraction of pixels that must move
+BACKGROUND_ALPHA = 0.05    # running-average background update rate
+ROI_MARGIN = 40            # full-res pixels added around the motion box
+ROI_FULL_FRAME = 0.6       # ROI covering more than this → scan the whole frame
+IDLE_RECHECK = 10.0        # seconds; recognize without motion this often
+
+
+# ================= HELPERS =================
+def union(a, b):
+    # boxes are (top, right, bottom, left) like face_recognition
+    return (min(a[0], b[0]), max(a[1], b[1]), max(a[2], b[2]), min(a[3], b[3]))
+
+
+# ================= MOTION DETECTOR =================
+class MotionDetector:
+    """
+    Per-camera gate for recognition: a 1/4-scale grey frame difference
+    against a running background. Motion marks the camera as due and
+    grows the ROI that face_locations will scan.
+    """
+
+    def __init__(self):
+        self.background = None
+        self.frame_size = None     # (height, width) at full resolution
+        self.roi = None            # union of motion since the last recognition
+        self.last_run = 0.0
+
+    def update(self, message):
+        small = cv2.imdecode(np.frombuffer(message, np.uint8), MOTION_DECODE)
+        if small is None:
+            return False
+
+        small = cv2.GaussianBlur(small, (5, 5), 0).astype(np.float32)
+
+        if self.background is None or self.background.shape != small.shape:
+            self.background = small
+            self.frame_size = (small.shape[0] * MOTION_SCALE, small.shape[1] * MOTION_SCALE)
+            return False
+
+        diff = cv2.absdiff(small, self.background)
+        cv2.accumulateWeighted(small, self.background, BACKGROUND_ALPHA)
+
+        mask = (diff > MOTION_THRESHOLD).astype(np.uint8)
+        if mask.mean() < MOTION_MIN_AREA:
+            return False
+
+        x, y, w, h = cv2.boundingRect(mask)
+        height, width = self.frame_size
+        box = (
+            max(0, y * MOTION_SCALE - ROI_MARGIN),
+            min(width, (x + w) * MOTION_SCALE + ROI_MARGIN),
+            min(height, (y + h) * MOTION_SCALE + ROI_MARGIN),
+            max(0, x * MOTION_SCALE - ROI_MARGIN)
+        )
+
+        self.roi = box if self.roi is None else union(self.roi, box)
+        return True
+
+    def due(self, now):
+        return self.roi is not None or now - self.last_run >= IDLE_RECHECK
+
+    def take_roi(self, now):
+        """ROI for the recognition starting now; None means the whole frame."""
+        roi, self.roi = self.roi, None
+        self.last_run = now
+
+        if roi is None or self.frame_size is None:
+            return None
+
+        t, r, b, l = roi
+        height, width = self.frame_size
+        if (b - t) * (r - l) > ROI_FULL_FRAME * height * width:
+            return None
+
+        return roi
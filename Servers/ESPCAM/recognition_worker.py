@@ -0,0 +1,119 @@
+import os
+import asyncio
+import numpy as np
+import face_recognition
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from tracking import match_boxes
+
+# ================= CONFIG =================
+RECOGNITION_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+
+# ================= WORKER SIDE (runs in the pool) =================
+def warmup():
+    # first call pays for importing dlib models, do it before frames arrive
+    return os.getpid()
+
+
+def detect_and_encode(shm_name, shape, roi=None, carry_boxes=()):
+    """
+    HOG detection (inside roi when given) + encoding of new faces only.
+    Returns (locations, encodings, carried): a face overlapping
+    carry_boxes[j] gets carried[i] = j and no encoding (None).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        rgb = np.ascontiguousarray(frame[:, :, ::-1])   # BGR → RGB, own copy
+        del frame
+    finally:
+        shm.close()
+
+    top, left = 0, 0
+    search = rgb
+    if roi is not None:
+        top, right, bottom, left = roi
+        search = rgb[top:bottom, left:right]
+
+    locations = [
+        (t + top, r + left, b + top, l + left)
+        for (t, r, b, l) in face_recognition.face_locations(search, model="hog")
+    ]
+
+    carried = match_boxes(locations, list(carry_boxes))
+    fresh = [loc for loc, c in zip(locations, carried) if c < 0]
+    fresh_encodings = iter(face_recognition.face_encodings(rgb, fresh))
+
+    encodings = [
+        next(fresh_encodings).astype(np.float32) if c < 0 else None
+        for c in carried
+    ]
+    return locations, encodings, carried
+
+
+# ================= MAIN SIDE =================
+class FrameSlot:
+    """Shared-memory buffer a frame is copied into once, for a worker to read."""
+
+    def __init__(self):
+        self.shm = None
+        self.shape = None
+
+    def write(self, frame):
+        if self.shm is None or self.shm.size < frame.nbytes:
+            self.release()
+            self.shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+
+        self.shape = frame.shape
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf)
+        view[...] = frame
+        del view
+
+    def crop(self, t, r, b, l):
+        # copy out, so no view into shm outlives the call
+        view = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        face = view[t:b, l:r].copy()
+        del view
+        return face
+
+    def release(self):
+        if self.shm is None:
+            return
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+
+
+class RecognitionPool:
+    """Process pool for face_locations / face_encodings, outside the GIL."""
+
+    def __init__(self, workers=RECOGNITION_WORKERS):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, warmup)
+            for _ in range(self.workers)
+        ])
+        print(f"🧠 Recognition pool ready: {len(set(pids))} worker(s)")
+
+    async def recognize(self, slot, roi=None, carry_boxes=()):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            detect_and_encode,
+            slot.shm.name,
+            slot.shape,
+            roi,
+            carry_boxes
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,176 @@
+# ================= CONFIG =================
+TRACK_IOU = 0.3             # overlap needed to treat a detection as the same face
+CENTROID_RATIO = 0.5        # fallback: centre moved less than half a box width
+TRACK_MAX_MISSES = 2        # drop a track after this many scans that missed it
+TRACK_TTL = 30.0            # and in any case after this long without a detection
+CONFIDENCE_HALF_LIFE = 5.0  # seconds for a cached identity's confidence to halve
+REVERIFY_BELOW = 0.4        # re-encode a track once confidence decays below this
+REVERIFY_EVERY = 15.0       # and at least this often, whatever the confidence
+
+
+# ================= HELPERS =================
+def iou(a, b):
+    # boxes are (top, right, bottom, left) like face_recognition
+    t, r = max(a[0], b[0]), min(a[1], b[1])
+    bt, l = min(a[2], b[2]), max(a[3], b[3])
+
+    inter = max(0, r - l) * max(0, bt - t)
+    if inter == 0:
+        return 0.0
+
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    return inter / float(area_a + area_b - inter)
+
+
+def match_boxes(boxes, previous, threshold=TRACK_IOU):
+    """
+    Greedy IoU association. Returns, for every box, the index of the
+    previous box it continues, or -1 for a new face.
+    """
+    pairs = sorted(
+        (
+            (iou(box, prev), i, j)
+            for i, box in enumerate(boxes)
+            for j, prev in enumerate(previous)
+        ),
+        reverse=True
+    )
+
+    result = [-1] * len(boxes)
+    used = set()
+
+    for score, i, j in pairs:
+        if score < threshold:
+            break
+        if result[i] == -1 and j not in used:
+            result[i] = j
+            used.add(j)
+
+    return result
+
+
+def inside(box, region):
+    return (
+        region is None
+        or (box[0] >= region[0] and box[1] <= region[1]
+            and box[2] <= region[2] and box[3] >= region[3])
+    )
+
+
+def centroid_close(a, b, ratio):
+    ax, ay = (a[1] + a[3]) / 2, (a[0] + a[2]) / 2
+    bx, by = (b[1] + b[3]) / 2, (b[0] + b[2]) / 2
+    size = max(a[1] - a[3], b[1] - b[3], 1)
+    return ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5 <= ratio * size
+
+
+# ================= FACE TRACK =================
+class FaceTrack:
+    """
+    One face followed across detections. Its identity is cached with a
+    confidence (margin from the match threshold) that halves every
+    CONFIDENCE_HALF_LIFE seconds; the face is only re-encoded when that
+    drops below REVERIFY_BELOW or REVERIFY_EVERY has passed.
+    """
+
+    def __init__(self, track_id, box, now):
+        self.track_id = track_id
+        self.box = box
+        self.name = None
+        self.distance = None
+        self.confidence = 0.0
+        self.verified_at = 0.0
+        self.last_seen = now
+        self.last_event = None
+        self.misses = 0
+
+    def current_confidence(self, now):
+        age = now - self.verified_at
+        return self.confidence * 0.5 ** (age / CONFIDENCE_HALF_LIFE)
+
+    def needs_verify(self, now):
+        return (
+            self.name is None
+            or self.current_confidence(now) < REVERIFY_BELOW
+            or now - self.verified_at > REVERIFY_EVERY
+        )
+
+    def verify(self, name, distance, tolerance, now):
+        # 1.0 = far from the threshold either way, 0.0 = right on it
+        margin = abs(distance - tolerance) / tolerance if distance != float("inf") else 1.0
+        self.name = name
+        self.distance = distance
+        self.confidence = min(1.0, 2 * margin)
+        self.verified_at = now
+
+    def event_due(self, now, cooldown):
+        return self.last_event is None or now - self.last_event > cooldown
+
+
+# ================= TRACK SET =================
+class TrackSet:
+    """Per-camera tracks, associated by IoU with a centroid fallback."""
+
+    def __init__(self):
+        self.tracks = []
+        self.next_id = 1
+
+    def verified(self, now):
+        # tracks whose cached identity is still trusted → worker skips encoding
+        return [t for t in self.tracks if not t.needs_verify(now)]
+
+    def update(self, boxes, carried, now, searched=None):
+        """
+        boxes: detections this cycle. carried[i]: the track the worker already
+        matched box i to (identity reused), or None. searched: region HOG
+        scanned (None = whole frame). Returns one track per box; tracks inside
+        the searched region but not detected count a miss.
+        """
+        result = list(carried)
+        taken = {id(t) for t in carried if t is not None}
+        free = [t for t in self.tracks if id(t) not in taken]
+
+        loose = [i for i, t in enumerate(result) if t is None]
+        assoc = match_boxes([boxes[i] for i in loose], [t.box for t in free])
+
+        for i, j in zip(loose, assoc):
+            if j >= 0:
+                result[i] = free[j]
+                taken.add(id(free[j]))
+
+        for i in loose:
+            if result[i] is not None:
+                continue
+            for t in free:
+                if id(t) not in taken and centroid_close(boxes[i], t.box, CENTROID_RATIO):
+                    result[i] = t
+                    taken.add(id(t))
+                    break
+            else:
+                result[i] = FaceTrack(self.next_id, boxes[i], now)
+                self.next_id += 1
+                self.tracks.append(result[i])
+                taken.add(id(result[i]))
+
+        for box, track in zip(boxes, result):
+            track.box = box
+            track.last_seen = now
+            track.misses = 0
+
+        for t in self.tracks:
+            if id(t) not in taken and inside(t.box, searched):
+                t.misses += 1
+
+        self.tracks = [
+            t for t in self.tracks
+            if t.misses < TRACK_MAX_MISSES and now - t.last_seen <= TRACK_TTL
+        ]
+        return result
+
+    def unsearched(self, current, searched):
+        """Live tracks outside the searched region (not in current), at their last box."""
+        if searched is None:
+            return []
+        taken = {id(t) for t in current}
+        return [t for t in self.tracks if id(t) not in taken and not inside(t.box, searched)]
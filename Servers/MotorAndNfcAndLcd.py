@@ -1,83 +1,89 @@
 import asyncio
 import websockets
 import json
+import os
+import time
 from datetime import datetime
-import socketio
 
-# ================= USERS (NFC) =================
-USERS = {
-    "A4961F3E": "Ammar",
-    "03976D6A": "Hana",
-    "945C453E": "Menna",
-    "038E226A": "Mohamed",
-    "1BB24302": "Andrew",
-    "33D3316A": "Mostafa",
-    "94A9133E": "Filo"
-}
+from credentials import CredentialStore
+from dashboard_bridge import DashboardBridge, LatencyHistogram
+from doors import DoorRegistry, connection_path, parse_door_path
 
-# ================= SOCKET.IO CLIENT (Main Server) =================
-sio = socketio.Client()
+# ================= USERS (NFC) =================
+# nfc_users.json (or a .db with a badges table) is reloaded on change,
+# no restart needed: add cards, time windows, expiry or revoke UIDs there
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CREDENTIALS_FILE = os.path.join(BASE_DIR, "nfc_users.json")
 
-@sio.event
-def connect():
-    print("✅ Connected to Main Server (Dashboard)")
+credentials = CredentialStore(CREDENTIALS_FILE)
 
-@sio.event
-def disconnect():
-    print("❌ Disconnected from Main Server")
+# ================= CONFIG =================
+MAIN_SERVER_URL = "http://localhost:5000"
+STATS_INTERVAL = 30        # seconds between latency / bridge reports
 
-sio.connect("http://localhost:5000")
+# ================= SOCKET.IO CLIENT (Main Server) =================
+# emits are queued and sent by a background task: a slow or offline
+# mainServer never delays the reply to a door
+dashboard = DashboardBridge(MAIN_SERVER_URL)
 
 # ================= GLOBALS =================
-connected_esp = set()
-main_loop = None   # 🔥 event loop الأساسي
+# controllers connect on ws://<pc>:8765/door/<door_id>; face events open
+# only the doors mapped to their camera in doors.CAMERA_DOORS
+doors = DoorRegistry()
+tap_latency = LatencyHistogram()   # NFC message in → OPEN/DENIED sent
 
 # ================= OPEN DOOR =================
-async def open_door(name):
-    for ws in list(connected_esp):
-        try:
-            await ws.send(json.dumps({
-                "action": "OPEN",
-                "name": name
-            }))
-        except:
-            connected_esp.discard(ws)
+async def open_door(door_ids, name):
+    delivered = await doors.send(door_ids, {
+        "action": "OPEN",
+        "name": name
+    })
+    for door_id, ok in delivered.items():
+        if not ok:
+            print(f"⚠️ Door {door_id} not connected, OPEN for {name} not delivered")
+    return delivered
 
 # ================= FACE EVENT =================
-@sio.on("face_event")
-def handle_face_event(data):
+async def handle_face_event(data):
     try:
         if data.get("status") != "known":
             return
 
         name = data.get("name", "Unknown")
+        camera_id = data.get("camera")
         now = datetime.now().strftime("%H:%M:%S")
 
-        print(f"📷 FACE ACCESS GRANTED: {name}")
+        door_ids = doors.doors_for_camera(camera_id)
+        if not door_ids:
+            print(f"⚠️ FACE {name} at {camera_id}: no door mapped to this camera")
+            return
+
+        print(f"📷 FACE ACCESS GRANTED: {name} at {camera_id} → {', '.join(door_ids)}")
 
-        # 🔑 افتح الباب باستخدام الـ event loop الصح
-        if main_loop:
-            asyncio.run_coroutine_threadsafe(
-                open_door(name),
-                main_loop
-            )
+        # 🔑 AsyncClient handlers already run on the server's event loop
+        await open_door(door_ids, name)
 
         # Dashboard log
-        sio.emit("nfc_event", {
+        dashboard.emit("nfc_event", {
             "status": "AUTHORIZED",
             "uid": "FACE",
             "name": name,
             "method": "FACE",
+            "camera": camera_id,
+            "doors": door_ids,
             "time": now
         })
 
     except Exception as e:
         print("❌ FACE EVENT ERROR:", e)
 
+dashboard.on("face_event", handle_face_event)
+
 # ================= NFC + MOTOR + LCD SERVER =================
 async def handler(websocket):
-    print("📡 ESP Connected")
-    connected_esp.add(websocket)
+    door_id = parse_door_path(connection_path(websocket))
+    print(f"📡 ESP Connected: {door_id}")
+    doors.register(door_id, websocket)
 
     try:
         async for message in websocket:
@@ -85,24 +91,27 @@ async def handler(websocket):
 
             # ===== NFC EVENT =====
             if "uid" in data:
+                received = time.perf_counter()
                 uid = data["uid"]
+                name, reason = credentials.check(uid)
                 now = datetime.now().strftime("%H:%M:%S")
 
                 # ===== AUTHORIZED =====
-                if uid in USERS:
-                    name = USERS[uid]
+                if name and reason is None:
 
                     # فتح الباب (زي ما كان)
                     await websocket.send(json.dumps({
                         "action": "OPEN",
                         "name": name
                     }))
+                    tap_latency.observe((time.perf_counter() - received) * 1000)
 
-                    sio.emit("nfc_event", {
+                    dashboard.emit("nfc_event", {
                         "status": "AUTHORIZED",
                         "uid": uid,
                         "name": name,
                         "method": "NFC",
+                        "door": door_id,
                         "time": now
                     })
 
@@ -113,30 +122,62 @@ async def handler(websocket):
                     await websocket.send(json.dumps({
                         "action": "DENIED"
                     }))
+                    tap_latency.observe((time.perf_counter() - received) * 1000)
 
-                    sio.emit("nfc_event", {
+                    dashboard.emit("nfc_event", {
                         "status": "DENIED",
                         "uid": uid,
-                        "name": "Unknown",
+                        "name": name or "Unknown",
                         "method": "NFC",
+                        "door": door_id,
+                        "reason": reason,
                         "time": now
                     })
 
-                    print(f"❌ NFC ACCESS DENIED: {uid}")
+                    print(f"❌ NFC ACCESS DENIED: {uid} ({reason})")
 
     except websockets.exceptions.ConnectionClosed:
-        print("⚠️ ESP Disconnected")
+        print(f"⚠️ ESP Disconnected: {door_id}")
 
     finally:
-        connected_esp.discard(websocket)
+        doors.unregister(door_id, websocket)
+
+# ================= METRICS =================
+async def report_metrics():
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+
+        lat = tap_latency.stats()
+        st = dashboard.stats()
+        ds = doors.stats()
+        print(
+            f"🚪 doors: {len(ds['doors'])} connected, timeouts={ds['timeouts']} "
+            f"fan-out p50≤{ds['fanout']['p50_ms']}ms max={ds['fanout']['max_ms']}ms"
+        )
+        print(
+            f"⏱️ tap→command: n={lat['count']} avg={lat['avg_ms']}ms "
+            f"p50≤{lat['p50_ms']}ms p99≤{lat['p99_ms']}ms max={lat['max_ms']}ms"
+        )
+        print(
+            f"📨 dashboard: connected={st['connected']} queued={st['queued']} "
+            f"sent={st['sent']} dropped={st['dropped']} failures={st['failures']}"
+        )
 
 # ================= MAIN =================
 async def main():
-    global main_loop
-    main_loop = asyncio.get_running_loop()   # 🔥 نخزن الـ loop
+    try:
+        cards, revoked = credentials.load()
+        print(f"🪪 Loaded {cards} NFC cards ({revoked} revoked)")
+    except Exception as e:
+        print("⚠️ No NFC credentials loaded, every card is denied:", e)
+
+    asyncio.create_task(credentials.watch())
+    asyncio.create_task(dashboard.run())
+    asyncio.create_task(report_metrics())
 
     async with websockets.serve(handler, "0.0.0.0", 8765):
         print("🚀 NFC / FACE / Motor Server Running on port 8765")
         await asyncio.Future()  # run forever
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
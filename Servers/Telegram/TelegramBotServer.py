@@ -4,6 +4,13 @@ import requests
 import os
 import threading
 
+from dispatcher import (
+    TelegramDispatcher, PRIORITY_ALARM, PRIORITY_REPLY, PRIORITY_NOTICE
+)
+from photos import PhotoSender
+from subscriptions import SubscriptionStore
+from digest import DigestAggregator, make_collage, COLLAGE_TILE, OVERFLOW, cv2
+
 os.makedirs("/Sub", exist_ok=True)
 
 # ================= CONFIG =================
@@ -12,14 +19,14 @@ MAIN_SERVER_URL = "http://localhost:5000"
 TELEGRAM_TOKEN = "PutYourTokenHere"  # 🔑 Replace with your Telegram Bot Token
 TELEGRAM_API = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}"
 
+SUB_DB = "/Sub/subscriptions.db"
+
+# pre-SQLite subscription files, imported once on startup
 CHAT_FILE = "/Sub/chat_ids.txt"
 STARTED_FILE = "/Sub/started_users.txt"
 VIB_FILE = "/Sub/vibration_subs.txt"
 NFC_FILE = "/Sub/nfc_subs.txt"
-FACE_FILE = "/Sub/face_subs.txt"   # 🔥 NEW
-
-EARTHQUAKE_COOLDOWN = 30
-FACE_COOLDOWN = 20   # ⏱️ Face cooldown
+FACE_FILE = "/Sub/face_subs.txt"
 
 # 📍 Camera Location
 CAMERA_LAT = 30.0444
@@ -28,72 +35,34 @@ CAMERA_LON = 31.2357
 # ================= SOCKET.IO CLIENT =================
 sio = socketio.Client()
 
-# ================= STATE =================
-all_users = set()
-started_users = set()
-vibration_users = set()
-nfc_users = set()
-face_users = set()          # 🔥 NEW
+# every outbound call: worker pool, shared session, rate limits, priorities
+dispatcher = TelegramDispatcher(TELEGRAM_API)
 
-last_state = None
-last_earthquake_time = 0
-vibration_active = False
-last_face_time = {}         # 🔥 NEW
+# face crops: fetched from mainServer once, uploaded once, then sent by file_id
+photos = PhotoSender(dispatcher, MAIN_SERVER_URL)
 
-# ================= FILE HELPERS =================
-def load_file(path, target_set):
-    if not os.path.exists(path):
-        return
-    with open(path, "r") as f:
-        for line in f:
-            if line.strip().isdigit():
-                target_set.add(int(line.strip()))
+# chats, topics and per-chat filters; survives restarts
+subs = SubscriptionStore(SUB_DB)
 
-def save_to_file(path, chat_id, target_set):
-    if chat_id in target_set:
-        return
-    target_set.add(chat_id)
-    with open(path, "a") as f:
-        f.write(str(chat_id) + "\n")
+# ================= STATE =================
+last_state = None
+vibration_active = False
 
 # ================= TELEGRAM =================
-def send_message(chat_id, text, keyboard=None):
-    payload = {
-        "chat_id": chat_id,
-        "text": text,
-        "parse_mode": "Markdown"
-    }
-    if keyboard:
-        payload["reply_markup"] = keyboard
+# all queued on the dispatcher; nothing here blocks the Socket.IO thread
+def send_message(chat_id, text, keyboard=None, priority=PRIORITY_REPLY):
+    dispatcher.send_message(chat_id, text, priority, keyboard)
 
-    requests.post(
-        f"{TELEGRAM_API}/sendMessage",
-        json=payload,
-        timeout=5
-    )
-
-def send_photo(chat_id, image_url, caption):
-    requests.post(
-        f"{TELEGRAM_API}/sendPhoto",
-        json={
-            "chat_id": chat_id,
-            "photo": image_url,
-            "caption": caption,
-            "parse_mode": "Markdown"
-        },
-        timeout=5
-    )
+def send_photo(chat_ids, image_url, caption, priority=PRIORITY_ALARM, fetch=None):
+    # image_url is a mainServer path ("/faces/..."), Telegram can't fetch it itself
+    photos.send(chat_ids, image_url, caption, priority, fetch)
 
-def send_location(chat_id):
-    requests.post(
-        f"{TELEGRAM_API}/sendLocation",
-        json={
-            "chat_id": chat_id,
-            "latitude": CAMERA_LAT,
-            "longitude": CAMERA_LON
-        },
-        timeout=5
-    )
+def send_location(chat_id, priority=PRIORITY_ALARM):
+    dispatcher.submit("sendLocation", {
+        "chat_id": chat_id,
+        "latitude": CAMERA_LAT,
+        "longitude": CAMERA_LON
+    }, priority)
 
 def main_menu():
     return {
@@ -107,16 +76,73 @@ def main_menu():
                 {"text": "🔐 Subscribe NFC", "callback_data": "sub_nfc"},
                 {"text": "🚫 Unsubscribe NFC", "callback_data": "unsub_nfc"}
             ],
+            [{"text": "⛔ NFC: Denied Only", "callback_data": "nfc_denied"}],
             [
                 {"text": "👤 Subscribe Face", "callback_data": "sub_face"},
                 {"text": "🚫 Unsubscribe Face", "callback_data": "unsub_face"}
-            ]
+            ],
+            [{"text": "🔴 Face: Unknown Only", "callback_data": "face_unknown"}]
         ]
     }
 
-def broadcast(target_set, text):
-    for chat_id in target_set:
-        send_message(chat_id, text)
+def broadcast(chat_ids, text, priority=PRIORITY_NOTICE):
+    for chat_id in chat_ids:
+        send_message(chat_id, text, priority=priority)
+
+# ================= DIGESTS =================
+def send_collage(chat_ids, image_urls, caption):
+    if cv2 is None or len(image_urls) == 1:
+        send_photo(chat_ids, image_urls[-1], caption)
+        return
+
+    def build():
+        crops = []
+        for url in image_urls:
+            try:
+                crops.append(photos.fetch(url, COLLAGE_TILE))
+            except requests.RequestException as e:
+                print("❌ Collage crop fetch failed:", url, e)
+        return make_collage(crops) or photos.fetch(image_urls[-1])
+
+    send_photo(chat_ids, "collage:" + "|".join(image_urls), caption, fetch=build)
+
+def plural(n, word):
+    return f"{n} {word}" if n == 1 else f"{n} {word}s"
+
+def send_digest(group):
+    # everyone whose filters accept at least one of the grouped events
+    chats = set()
+    for event in group.events.values():
+        chats.update(subs.subscribers(group.topic, event))
+    if not chats:
+        return
+
+    f = group.fields
+    n = group.count
+    seconds = round(group.window_end - group.started)
+
+    if group.topic == "vibration":
+        broadcast(chats, f"📳 *Vibration continues*\n{plural(n, 'more alert')} in {seconds} s", PRIORITY_ALARM)
+
+    elif group.topic == "nfc":
+        what = "NFC event" if f["status"] == OVERFLOW else f"{f['status']} tap"
+        who = "several cards" if f["name"] == OVERFLOW else f["name"]
+        broadcast(chats, f"🔐 *{plural(n, 'more ' + what)}*\n👤 {who}, last {seconds} s")
+
+    elif f["status"] == "known":
+        broadcast(chats, f"🟢 *{f['name']}* seen {plural(n, 'more time')} at {f['camera']} in {seconds} s")
+
+    else:
+        what = "unknown face" if f["status"] == "unknown" else "face alert"
+        where = "several cameras" if f["camera"] == OVERFLOW else f["camera"]
+        caption = f"🔴 *{plural(n, 'more ' + what)}* at {where} in {seconds} s"
+        if group.image_urls:
+            send_collage(chats, group.image_urls, caption)
+        else:
+            broadcast(chats, caption, PRIORITY_ALARM)
+
+# first event of a burst goes out as usual, the rest as one digest per window
+digests = DigestAggregator(send_digest)
 
 # ================= SOCKET EVENTS =================
 @sio.event
@@ -125,27 +151,36 @@ def connect():
 
 @sio.on("update")
 def on_update(data):
-    global last_state, last_earthquake_time, vibration_active
-    last_state = data
+    # mainServer sends the full state on connect, then only changed fields
+    global last_state, vibration_active
+
+    if last_state is None:
+        last_state = {"radar": {}, "sensors": {}}
+    for channel, values in data.items():
+        last_state.setdefault(channel, {}).update(values)
+
+    if "vib" not in data.get("sensors", {}):
+        return
 
     vib = data["sensors"]["vib"]
-    now = time.time()
 
     if vib == 1 and not vibration_active:
         vibration_active = True
-        if vibration_users and now - last_earthquake_time >= EARTHQUAKE_COOLDOWN:
+        chats = subs.subscribers("vibration")
+        if chats and digests.add("vibration"):
             broadcast(
-                vibration_users,
-                "📳     *EARTHQUAKE ALERT*      📳\nVibration detected!"
+                chats,
+                "📳     *EARTHQUAKE ALERT*      📳\nVibration detected!",
+                PRIORITY_ALARM
             )
-            last_earthquake_time = now
 
     elif vib == 0:
         vibration_active = False
 
 @sio.on("nfc_event")
 def on_nfc(data):
-    if not nfc_users:
+    chats = subs.subscribers("nfc", data)
+    if not chats or not digests.add("nfc", data):
         return
 
     msg = (
@@ -154,47 +189,30 @@ def on_nfc(data):
         f"*Name:* {data['name']}\n"
         f"*UID:* `{data['uid']}`"
     )
-    broadcast(nfc_users, msg)
+    broadcast(chats, msg)
 
 # ================= FACE EVENT =================
 @sio.on("face_event")
 def on_face(data):
-    if not face_users:
+    chats = subs.subscribers("face", data)
+    if not chats or not digests.add("face", data):
         return
 
     name = data.get("name", "UNKNOWN")
     status = data.get("status", "unknown")
     image_url = data.get("image_url")
 
-    now = time.time()
-    key = name if status == "known" else "unknown"
-
-    if key in last_face_time and now - last_face_time[key] < FACE_COOLDOWN:
-        return
-
-    last_face_time[key] = now
-
     if status == "known":
-        broadcast(face_users, f"🟢 *FACE ACCESS GRANTED*\n👤 Name: {name}")
+        broadcast(chats, f"🟢 *FACE ACCESS GRANTED*\n👤 Name: {name}")
     else:
-        for chat_id in face_users:
+        for chat_id in chats:
             send_location(chat_id)
-            send_photo(
-                chat_id,
-                f"http://localhost:5000{image_url}",
-                "🔴 *UNKNOWN FACE DETECTED*"
-            )
+        send_photo(chats, image_url, "🔴 *UNKNOWN FACE DETECTED*")
 
 # ================= TELEGRAM POLLING =================
 def telegram_polling():
     offset = 0
 
-    load_file(CHAT_FILE, all_users)
-    load_file(STARTED_FILE, started_users)
-    load_file(VIB_FILE, vibration_users)
-    load_file(NFC_FILE, nfc_users)
-    load_file(FACE_FILE, face_users)
-
     while True:
         r = requests.get(
             f"{TELEGRAM_API}/getUpdates",
@@ -214,37 +232,45 @@ def telegram_polling():
                 action = cb["data"]
 
                 if action == "sub_vib":
-                    save_to_file(VIB_FILE, chat_id, vibration_users)
+                    subs.subscribe(chat_id, "vibration")
                     send_message(chat_id, "✅ Subscribed to vibration alerts")
 
                 elif action == "unsub_vib":
-                    vibration_users.discard(chat_id)
+                    subs.unsubscribe(chat_id, "vibration")
                     send_message(chat_id, "❌ Unsubscribed from vibration alerts")
 
                 elif action == "sub_nfc":
-                    save_to_file(NFC_FILE, chat_id, nfc_users)
+                    subs.subscribe(chat_id, "nfc")
                     send_message(chat_id, "✅ Subscribed to NFC alerts")
 
                 elif action == "unsub_nfc":
-                    nfc_users.discard(chat_id)
+                    subs.unsubscribe(chat_id, "nfc")
                     send_message(chat_id, "❌ Unsubscribed from NFC alerts")
 
+                elif action == "nfc_denied":
+                    subs.set_filter(chat_id, "nfc", "status", ["DENIED"])
+                    send_message(chat_id, "✅ NFC alerts: denied cards only")
+
                 elif action == "sub_face":
-                    save_to_file(FACE_FILE, chat_id, face_users)
+                    subs.subscribe(chat_id, "face")
                     send_message(chat_id, "✅ Subscribed to FACE alerts")
 
                 elif action == "unsub_face":
-                    face_users.discard(chat_id)
+                    subs.unsubscribe(chat_id, "face")
                     send_message(chat_id, "❌ Unsubscribed from FACE alerts")
 
+                elif action == "face_unknown":
+                    subs.set_filter(chat_id, "face", "status", ["unknown"])
+                    send_message(chat_id, "✅ FACE alerts: unknown faces only")
+
                 elif action == "status" and last_state:
                     s = last_state["sensors"]
                     send_message(
                         chat_id,
                         f"📊 *System Status*\n\n"
-                        f"🌡 Temp: {s['temp']} °C\n"
-                        f"💧 Humidity: {s['hum']} %\n"
-                        f"⛽ Gas: {s['gas']}"
+                        f"🌡 Temp: {s.get('temp')} °C\n"
+                        f"💧 Humidity: {s.get('hum')} %\n"
+                        f"⛽ Gas: {s.get('gas')}"
                     )
 
             if "message" in update:
@@ -253,19 +279,44 @@ def telegram_polling():
                 text = msg.get("text", "")
 
                 if text == "/start":
-                    save_to_file(CHAT_FILE, chat_id, all_users)
-                    save_to_file(STARTED_FILE, chat_id, started_users)
+                    subs.add_user(chat_id)
                     send_message(chat_id, "🤖 Bot started\nUse /menu")
 
                 elif text == "/menu":
                     send_message(chat_id, "📋 *Main Menu*", main_menu())
 
+                # every subscription back to all events (Subscribe buttons keep filters)
+                elif text == "/clearfilters":
+                    cleared = [t for t in ("vibration", "nfc", "face") if subs.clear_filters(chat_id, t)]
+                    send_message(
+                        chat_id,
+                        f"✅ Filters cleared: {', '.join(cleared)}" if cleared else "ℹ️ No subscriptions to clear"
+                    )
+
+                # /cameras cam_01 cam_02 → face alerts from those cameras only, /cameras all → any
+                elif text.startswith("/cameras"):
+                    cameras = [c for c in text.split()[1:] if c != "all"]
+                    subs.set_filter(chat_id, "face", "camera", cameras or None)
+                    send_message(
+                        chat_id,
+                        f"✅ FACE alerts from: {', '.join(cameras) if cameras else 'all cameras'}"
+                    )
+
         time.sleep(1)
 
 # ================= MAIN =================
 if __name__ == "__main__":
     print("🚀 Telegram Server Started")
 
+    subs.migrate(
+        [CHAT_FILE, STARTED_FILE],
+        {"vibration": VIB_FILE, "nfc": NFC_FILE, "face": FACE_FILE}
+    )
+    print("👥 Subscriptions:", subs.stats())
+
+    dispatcher.start()
+    digests.start()
+
     sio.connect(MAIN_SERVER_URL)
 
     threading.Thread(
@@ -0,0 +1,101 @@
+import time
+import requests
+
+import mock_telegram
+from dispatcher import (
+    TelegramDispatcher, GLOBAL_RATE, DISPATCH_WORKERS, PRIORITY_ALARM, PRIORITY_NOTICE
+)
+
+# ================= CONFIG =================
+# python bench_dispatcher.py
+#   broadcasts to SUBSCRIBERS chats on a local mock Bot API (50 ms per call,
+#   429 past 30/s global or 1/s per chat), old loop vs the dispatcher;
+#   then checks that jobs raising inside a worker don't stop the dispatcher
+SUBSCRIBERS = 300
+PORT = 8091
+API = f"http://127.0.0.1:{PORT}/botTEST"
+
+
+def old_broadcast(chats, text):
+    # the bot's original broadcast(): one blocking post per chat, 429s ignored
+    ok = 0
+    for chat_id in chats:
+        r = requests.post(f"{API}/sendMessage", json={"chat_id": chat_id, "text": text}, timeout=5)
+        ok += r.status_code == 200
+    return ok
+
+
+def wait_for(mock, n, method_text):
+    while sum(1 for c in list(mock.calls) if c[3].get("text") == method_text) < n:
+        time.sleep(0.01)
+
+
+def check_worker_errors(dispatcher, mock):
+    # more failing jobs than workers: if any killed its worker, nothing would be left
+    def broken_files():
+        raise RuntimeError("collage encode failed")
+
+    results = []
+    for i in range(DISPATCH_WORKERS + 1):
+        dispatcher.submit(
+            "sendPhoto", {"chat_id": 5000 + i}, PRIORITY_ALARM,
+            files=broken_files, on_result=results.append
+        )
+    dispatcher.send_message(6000, "after errors", PRIORITY_NOTICE)
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if any(c[3].get("text") == "after errors" for c in list(mock.calls)):
+            break
+        time.sleep(0.01)
+    else:
+        raise AssertionError("dispatcher stopped sending after worker errors")
+
+    assert results == [None] * (DISPATCH_WORKERS + 1), results
+    print(f"worker errors: {len(results)} failing jobs finished with None, next message still sent")
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    mock, server = mock_telegram.serve(PORT)
+    chats = list(range(1000, 1000 + SUBSCRIBERS))
+
+    start = time.perf_counter()
+    ok = old_broadcast(chats, "old notice")
+    old_time = time.perf_counter() - start
+    print(f"old loop:   {ok}/{SUBSCRIBERS} delivered in {old_time:.1f} s, {mock.rejected} rejected with 429 and lost")
+
+    time.sleep(1.5)
+    mock.calls.clear()
+    mock.rejected = 0
+
+    dispatcher = TelegramDispatcher(API)
+    dispatcher.start()
+
+    start = time.perf_counter()
+    for chat_id in chats:
+        dispatcher.send_message(chat_id, "notice", PRIORITY_NOTICE)
+    time.sleep(0.5)
+    alarm_at = time.perf_counter()
+    for chat_id in chats:
+        dispatcher.send_message(chat_id, "alarm", PRIORITY_ALARM)
+
+    wait_for(mock, SUBSCRIBERS, "alarm")
+    alarm_time = time.perf_counter() - alarm_at
+    wait_for(mock, SUBSCRIBERS, "notice")
+    total = time.perf_counter() - start
+
+    st = dispatcher.stats()
+    print(
+        f"dispatcher: {2 * SUBSCRIBERS} delivered in {total:.1f} s "
+        f"({2 * SUBSCRIBERS / total:.1f} msg/s, limit {GLOBAL_RATE}), "
+        f"alarm to all {SUBSCRIBERS} chats {alarm_time:.1f} s after it was raised"
+    )
+    print(
+        f"            429s={mock.rejected} retries={st['retries']} "
+        f"failed={st['failed']}"
+    )
+
+    check_worker_errors(dispatcher, mock)
+
+    server.shutdown()
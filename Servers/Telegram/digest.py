@@ -0,0 +1,191 @@
+import math
+import time
+import threading
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:   # digests go out with the latest crop instead of a collage
+    cv2 = None
+
+# ================= CONFIG =================
+TICK = 1.0               # seconds between window checks
+
+# per topic: window length, event fields that form a group, and how many
+# groups may be open at once (later ones share one overflow group)
+DIGEST_RULES = {
+    "vibration": {"window": 60, "group_by": (), "max_groups": 1},
+    "nfc": {"window": 30, "group_by": ("method", "status", "name"), "max_groups": 8},
+    "face": {"window": 60, "group_by": ("status", "camera", "name"), "max_groups": 8},
+}
+
+# events matching any of these are dropped outright, e.g.
+# ("face", {"status": ["known"], "camera": ["cam_lab"]})
+SUPPRESS = []
+
+OVERFLOW = "*"
+COLLAGE_MAX = 9          # crops kept per group for the digest collage
+COLLAGE_TILE = 128
+
+
+def suppressed(topic, event):
+    for rule_topic, fields in SUPPRESS:
+        if rule_topic == topic and all(event.get(f) in values for f, values in fields.items()):
+            return True
+    return False
+
+
+def identity(event):
+    # what tells two events apart for subscriber filters (timestamps and URLs don't)
+    return tuple(sorted(
+        (k, str(v)) for k, v in event.items()
+        if k != "time" and not k.endswith("_url")
+    ))
+
+
+def make_collage(jpegs, tile=COLLAGE_TILE):
+    """Square tiles of every decodable crop on one JPEG sheet; None without cv2."""
+    if cv2 is None:
+        return None
+
+    imgs = []
+    for data in jpegs:
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if img is not None:
+            imgs.append(cv2.resize(img, (tile, tile), interpolation=cv2.INTER_AREA))
+    if not imgs:
+        return None
+
+    cols = math.ceil(math.sqrt(len(imgs)))
+    rows = math.ceil(len(imgs) / cols)
+    sheet = np.zeros((rows * tile, cols * tile, 3), np.uint8)
+    for n, img in enumerate(imgs):
+        r, c = divmod(n, cols)
+        sheet[r * tile:(r + 1) * tile, c * tile:(c + 1) * tile] = img
+
+    ok, buf = cv2.imencode(".jpg", sheet, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buf.tobytes() if ok else None
+
+
+# ================= GROUP =================
+class Group:
+    """Events of one (topic, group_by values) key inside the current window."""
+
+    def __init__(self, topic, fields, window, now):
+        self.topic = topic
+        self.fields = fields          # {field: value}, OVERFLOW for the shared group
+        self.window = window
+        self.started = now
+        self.window_end = now + window
+        self.count = 0
+        self.image_urls = []
+        self.events = {}              # one event per identity(), for subscriber fan-out
+
+    def add(self, event):
+        self.count += 1
+        self.events.setdefault(identity(event), event)
+        if event.get("image_url"):
+            self.image_urls.append(event["image_url"])
+            del self.image_urls[:-COLLAGE_MAX]
+
+
+# ================= AGGREGATOR =================
+class DigestAggregator:
+    """
+    Windowed grouping of alert events. The first event of a quiet group
+    is sent as usual (add() returns True); the rest of that window is
+    counted and handed to deliver(group) as one digest when it closes.
+    A group that stays busy keeps getting one digest per window, so each
+    topic costs at most max_groups + 1 groups x (1 + 60 / window) sends
+    per minute per chat, however many events arrive.
+    """
+
+    def __init__(self, deliver, rules=DIGEST_RULES):
+        self.deliver = deliver
+        self.rules = rules
+        self.lock = threading.Lock()
+        self.groups = {}              # (topic, values...) → Group
+
+        self.events = 0
+        self.sent = 0
+        self.absorbed = 0
+        self.dropped = 0
+        self.digests = 0
+
+    def add(self, topic, event=None):
+        """Record one event; True means send it now, False means it goes into a digest."""
+        event = event or {}
+        if suppressed(topic, event):
+            with self.lock:
+                self.dropped += 1
+            return False
+
+        rule = self.rules[topic]
+        now = time.monotonic()
+
+        with self.lock:
+            self.events += 1
+            key = (topic,) + tuple(event.get(f) for f in rule["group_by"])
+            group = self.groups.get(key)
+
+            if group is None:
+                open_groups = sum(1 for k in self.groups if k[0] == topic and OVERFLOW not in k)
+                if open_groups < rule["max_groups"]:
+                    self.groups[key] = Group(topic, dict(zip(rule["group_by"], key[1:])), rule["window"], now)
+                    self.sent += 1
+                    return True
+
+                # too many distinct groups: fold the rest into one shared digest
+                key = (topic,) + (OVERFLOW,) * len(rule["group_by"])
+                group = self.groups.get(key)
+                if group is None:
+                    group = self.groups[key] = Group(topic, dict.fromkeys(rule["group_by"], OVERFLOW), rule["window"], now)
+
+            group.add(event)
+            self.absorbed += 1
+            return False
+
+    def tick(self):
+        now = time.monotonic()
+        due = []
+
+        with self.lock:
+            for key, group in list(self.groups.items()):
+                if group.window_end > now:
+                    continue
+                if group.count == 0:
+                    # a whole quiet window: the next event is sent right away again
+                    del self.groups[key]
+                    continue
+
+                # still busy: the group carries on into a fresh window
+                self.groups[key] = Group(group.topic, group.fields, group.window, now)
+                group.window_end = now
+                due.append(group)
+
+            self.digests += len(due)
+
+        for digest in due:
+            try:
+                self.deliver(digest)
+            except Exception as e:
+                print("❌ Digest delivery error:", e)
+
+    def run(self):
+        while True:
+            time.sleep(TICK)
+            self.tick()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "events": self.events,
+                "sent": self.sent,
+                "absorbed": self.absorbed,
+                "dropped": self.dropped,
+                "digests": self.digests,
+                "open_groups": len(self.groups)
+            }
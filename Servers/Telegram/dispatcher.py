@@ -0,0 +1,254 @@
+import time
+import heapq
+import queue
+import itertools
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# ================= CONFIG =================
+DISPATCH_WORKERS = 4
+GLOBAL_RATE = 28           # messages per second across all chats (a bit under Telegram's ~30)
+CHAT_RATE = 0.9            # messages per second to one private chat (Telegram: ~1)
+GROUP_RATE = 20 / 60       # messages per second to one group (chat_id < 0)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0        # seconds, doubled per retry (network / 5xx errors)
+REQUEST_TIMEOUT = 10
+
+# lower goes first
+PRIORITY_ALARM = 0         # earthquake, unknown face
+PRIORITY_REPLY = 1         # answers to a user's own command
+PRIORITY_NOTICE = 2        # routine NFC / known-face notices
+
+
+# ================= TOKEN BUCKET =================
+class TokenBucket:
+    """
+    rate tokens per second, up to burst. reserve() takes a token even if
+    it has to go into debt and returns how long to wait for it, so
+    concurrent callers line up instead of racing.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+
+# ================= DISPATCHER =================
+class TelegramDispatcher:
+    """
+    Outbound Bot API calls: a priority queue drained by a worker pool over
+    one keep-alive session. Every call waits on the global bucket; a call
+    whose chat bucket is empty reserves its turn and is parked until then,
+    so one busy chat never holds a worker. Retries are parked the same
+    way, and a 429 also pauses all workers for retry_after (up to
+    MAX_RETRIES times). api_base can point at a local mock of the Bot API.
+    """
+
+    def __init__(self, api_base, workers=DISPATCH_WORKERS):
+        self.api_base = api_base.rstrip("/")
+        self.workers = workers
+        self.queue = queue.PriorityQueue()
+        self.seq = itertools.count()   # FIFO within one priority
+
+        self.delayed = []              # heap of (not_before, seq, priority, job)
+        self.delayed_cv = threading.Condition()
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+
+        self.global_bucket = TokenBucket(GLOBAL_RATE)
+        self.chat_buckets = {}
+        self.buckets_lock = threading.Lock()
+
+        self.paused_until = 0.0        # set from 429 retry_after
+        self.pause_lock = threading.Lock()
+
+        self.stats_lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.deferred = 0
+
+    # ---------- submit ----------
+    def submit(self, method, payload, priority=PRIORITY_NOTICE, files=None, on_result=None):
+        """
+        Queue one Bot API call. payload is sent as JSON, or as form fields
+        when files are given; files may be a callable returning the files
+        dict, so slow reads happen on a worker. on_result(result or None)
+        runs on a worker too.
+        """
+        self.queue.put((priority, next(self.seq), {
+            "method": method,
+            "payload": payload,
+            "files": files,
+            "on_result": on_result,
+            "attempt": 0,
+            "chat_turn": False
+        }))
+
+    def send_message(self, chat_id, text, priority=PRIORITY_NOTICE, keyboard=None):
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}
+        if keyboard:
+            payload["reply_markup"] = keyboard
+        self.submit("sendMessage", payload, priority)
+
+    # ---------- limits ----------
+    def _chat_bucket(self, chat_id):
+        with self.buckets_lock:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                rate = GROUP_RATE if isinstance(chat_id, int) and chat_id < 0 else CHAT_RATE
+                bucket = self.chat_buckets[chat_id] = TokenBucket(rate)
+            return bucket
+
+    def _pause(self, seconds):
+        with self.pause_lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _wait_for_slot(self, job):
+        """0 when the call may go now, else seconds until its chat's reserved turn."""
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+        chat_id = job["payload"].get("chat_id")
+        if chat_id is not None and not job["chat_turn"]:
+            wait = self._chat_bucket(chat_id).reserve()
+            if wait > 0:
+                job["chat_turn"] = True    # token already reserved for when it comes back
+                return wait
+
+        wait = self.global_bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return 0.0
+
+    # ---------- parked jobs ----------
+    def _defer(self, priority, seq, job, delay):
+        with self.delayed_cv:
+            heapq.heappush(self.delayed, (time.monotonic() + delay, seq, priority, job))
+            self.delayed_cv.notify()
+
+    def _release(self):
+        # moves parked jobs back into the queue once their time comes
+        while True:
+            with self.delayed_cv:
+                while not self.delayed or self.delayed[0][0] > time.monotonic():
+                    timeout = self.delayed[0][0] - time.monotonic() if self.delayed else None
+                    self.delayed_cv.wait(timeout)
+                _, seq, priority, job = heapq.heappop(self.delayed)
+            self.queue.put((priority, seq, job))
+
+    # ---------- workers ----------
+    def _call(self, job):
+        url = f"{self.api_base}/{job['method']}"
+        if job["files"]:
+            files = job["files"]() if callable(job["files"]) else job["files"]
+            return self.session.post(url, data=job["payload"], files=files, timeout=REQUEST_TIMEOUT)
+        return self.session.post(url, json=job["payload"], timeout=REQUEST_TIMEOUT)
+
+    def _retry(self, priority, job, delay):
+        job["attempt"] += 1
+        job["chat_turn"] = False
+        with self.stats_lock:
+            self.retries += 1
+        self._defer(priority, next(self.seq), job, delay)
+
+    def _finish(self, job, result):
+        with self.stats_lock:
+            if result is None:
+                self.failed += 1
+            else:
+                self.sent += 1
+
+        if job["on_result"]:
+            try:
+                job["on_result"](result)
+            except Exception as e:
+                print("❌ Telegram callback error:", e)
+
+    def _work(self):
+        while True:
+            priority, seq, job = self.queue.get()
+
+            wait = self._wait_for_slot(job)
+            if wait > 0:
+                # keeps its place in line (same seq) once the chat's turn comes
+                with self.stats_lock:
+                    self.deferred += 1
+                self._defer(priority, seq, job, wait)
+                continue
+
+            try:
+                self._handle(priority, job)
+            except Exception as e:
+                # a raising files() callable, a malformed reply...: the worker lives on
+                print(f"❌ Telegram {job['method']} error:", e)
+                self._finish(job, None)
+
+    def _handle(self, priority, job):
+        try:
+            r = self._call(job)
+            body = r.json()
+        except (requests.RequestException, ValueError) as e:
+            if job["attempt"] < MAX_RETRIES:
+                self._retry(priority, job, RETRY_BACKOFF * 2 ** job["attempt"])
+            else:
+                print(f"❌ Telegram {job['method']} failed:", e)
+                self._finish(job, None)
+            return
+
+        if r.status_code == 429:
+            # Telegram says how long to back off; everyone waits, the call goes back in line
+            retry_after = body.get("parameters", {}).get("retry_after", 1)
+            with self.stats_lock:
+                self.rate_limited += 1
+            self._pause(retry_after)
+            if job["attempt"] < MAX_RETRIES:
+                self._retry(priority, job, retry_after)
+            else:
+                print(f"❌ Telegram {job['method']} still rate limited, giving up")
+                self._finish(job, None)
+            return
+
+        if r.status_code >= 500 and job["attempt"] < MAX_RETRIES:
+            self._retry(priority, job, RETRY_BACKOFF * 2 ** job["attempt"])
+            return
+
+        if not body.get("ok"):
+            print(f"❌ Telegram {job['method']} rejected:", body.get("description"))
+            self._finish(job, None)
+            return
+
+        self._finish(job, body.get("result"))
+
+    def start(self):
+        threading.Thread(target=self._release, daemon=True).start()
+        for _ in range(self.workers):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "queued": self.queue.qsize(),
+                "parked": len(self.delayed),
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "deferred": self.deferred
+            }
@@ -0,0 +1,148 @@
+import json
+import time
+import threading
+import itertools
+from collections import defaultdict, deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ================= CONFIG =================
+# python mock_telegram.py [port]
+#   a local stand-in for https://api.telegram.org/bot<token>: point
+#   TELEGRAM_API (or a TelegramDispatcher) at http://127.0.0.1:<port>/bot<any>
+MOCK_PORT = 8081
+MOCK_LATENCY = 0.05        # seconds added to every call, like a real round trip
+MOCK_GLOBAL_RATE = 30      # calls per second before 429
+MOCK_CHAT_RATE = 1         # calls per second per chat before 429
+
+
+# ================= MOCK API =================
+class MockTelegram:
+    """Records every call and answers 429 + retry_after past the Bot API limits."""
+
+    def __init__(self, latency=MOCK_LATENCY):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = []                      # (time, method, chat_id, fields)
+        self.recent = deque()                # call times in the last second
+        self.recent_chat = defaultdict(deque)
+        self.rejected = 0
+        self.file_ids = itertools.count(1)
+        self.uploads = 0
+
+    def _limited(self, chat_id, now):
+        while self.recent and now - self.recent[0] >= 1:
+            self.recent.popleft()
+        chat = self.recent_chat[chat_id]
+        while chat and now - chat[0] >= 1:
+            chat.popleft()
+
+        if len(self.recent) >= MOCK_GLOBAL_RATE or len(chat) >= MOCK_CHAT_RATE:
+            return True
+
+        self.recent.append(now)
+        chat.append(now)
+        return False
+
+    def handle(self, method, fields, uploaded):
+        time.sleep(self.latency)
+
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": []}
+
+        chat_id = fields.get("chat_id")
+        now = time.monotonic()
+
+        with self.lock:
+            if self._limited(chat_id, now):
+                self.rejected += 1
+                return 429, {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1}
+                }
+
+            self.calls.append((time.time(), method, chat_id, fields))
+            result = {"message_id": len(self.calls), "chat": {"id": chat_id}}
+
+            if method == "sendPhoto":
+                if uploaded:
+                    self.uploads += 1
+                    file_id = f"mock-file-{next(self.file_ids)}"
+                else:
+                    file_id = fields.get("photo")
+                result["photo"] = [{"file_id": file_id, "width": 320, "height": 320}]
+
+        return 200, {"ok": True, "result": result}
+
+
+def parse_multipart(body, content_type):
+    """Form fields of a multipart body (file parts are reported as uploaded)."""
+    boundary = content_type.split("boundary=")[1].encode()
+    fields, uploaded = {}, False
+
+    for part in body.split(b"--" + boundary):
+        head, _, value = part.partition(b"\r\n\r\n")
+        if b"name=" not in head:
+            continue
+        name = head.split(b'name="')[1].split(b'"')[0].decode()
+        if b"filename=" in head:
+            uploaded = True
+            continue
+        fields[name] = value.rstrip(b"\r\n").decode(errors="ignore")
+
+    return fields, uploaded
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            method = self.path.rstrip("/").split("/")[-1]
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            content_type = self.headers.get("Content-Type", "")
+
+            if content_type.startswith("multipart/form-data"):
+                fields, uploaded = parse_multipart(body, content_type)
+            else:
+                fields, uploaded = (json.loads(body) if body else {}), False
+
+            if "chat_id" in fields:
+                fields["chat_id"] = int(fields["chat_id"])
+
+            status, reply = mock.handle(method, fields, uploaded)
+            data = json.dumps(reply).encode()
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=MOCK_PORT, latency=MOCK_LATENCY):
+    """Start the mock in a thread; returns (mock, server)."""
+    mock = MockTelegram(latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(mock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return mock, server
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else MOCK_PORT
+    mock, server = serve(port)
+    print(f"🤖 Mock Telegram API on http://127.0.0.1:{port}/bot<token>")
+
+    while True:
+        time.sleep(10)
+        print(f"📨 calls={len(mock.calls)} rejected(429)={mock.rejected} uploads={mock.uploads}")
@@ -0,0 +1,177 @@
+import time
+import threading
+from collections import OrderedDict
+
+import requests
+
+from dispatcher import PRIORITY_ALARM
+
+# ================= CONFIG =================
+FILE_ID_CACHE_SIZE = 256
+FILE_ID_TTL = 24 * 3600     # seconds a Telegram file_id is reused
+FETCH_TIMEOUT = 5
+
+
+# ================= FILE ID CACHE =================
+class ExpiringLRU:
+    """OrderedDict LRU whose entries also expire ttl seconds after insertion."""
+
+    def __init__(self, max_items=FILE_ID_CACHE_SIZE, ttl=FILE_ID_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.items = OrderedDict()   # key → (expires_at, value)
+
+    def get(self, key):
+        entry = self.items.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self.items[key]
+            return None
+        self.items.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value):
+        self.items[key] = (time.monotonic() + self.ttl, value)
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+
+
+# ================= PHOTO SENDER =================
+class PhotoSender:
+    """
+    Face photos for many chats with one upload: the crop is fetched from
+    mainServer and uploaded as multipart to the first chat, the returned
+    file_id is cached, and every other chat gets the file_id. Chats that
+    arrive while that upload is in flight wait for its file_id. If a chat
+    refuses the upload the next waiting chat gets it; if the crop can't be
+    fetched or nobody accepts it, the caption goes out as text.
+    """
+
+    def __init__(self, dispatcher, server_url):
+        self.dispatcher = dispatcher
+        self.server_url = server_url.rstrip("/")
+        self.session = requests.Session()
+
+        self.lock = threading.Lock()
+        self.file_ids = ExpiringLRU()
+        self.inflight = {}          # image_url → upload state, see send()
+
+        self.uploads = 0
+        self.reused = 0
+
+    def send(self, chat_ids, image_url, caption, priority=PRIORITY_ALARM, fetch=None):
+        """
+        image_url is the cache key and, unless fetch() is given to build
+        the JPEG bytes, the mainServer path the crop is fetched from.
+        """
+        chat_ids = list(chat_ids)
+        if not chat_ids:
+            return
+
+        with self.lock:
+            file_id = self.file_ids.get(image_url)
+
+            if file_id is None:
+                state = self.inflight.get(image_url)
+                if state is not None:
+                    state["waiting"].extend((c, caption, priority) for c in chat_ids)
+                    return
+
+                # waiting: (chat_id, caption, priority) for the file_id;
+                # data: the JPEG once fetched, reused if another chat must upload
+                self.inflight[image_url] = state = {
+                    "waiting": [(c, caption, priority) for c in chat_ids[1:]],
+                    "fetch": fetch or (lambda: self.fetch(image_url)),
+                    "data": None,
+                    "fetch_failed": False
+                }
+
+        if file_id is not None:
+            for chat_id in chat_ids:
+                self._send_file_id(chat_id, file_id, caption, priority)
+            return
+
+        self._upload(image_url, state, (chat_ids[0], caption, priority))
+
+    def _upload(self, image_url, state, target):
+        chat_id, caption, priority = target
+
+        def files():
+            if state["data"] is None:
+                try:
+                    state["data"] = state["fetch"]()
+                except Exception:
+                    state["fetch_failed"] = True
+                    raise
+            state["fetch_failed"] = False
+            return {"photo": ("face.jpg", state["data"], "image/jpeg")}
+
+        with self.lock:
+            self.uploads += 1
+        self.dispatcher.submit(
+            "sendPhoto",
+            {"chat_id": chat_id, "caption": caption, "parse_mode": "Markdown"},
+            priority,
+            files=files,
+            on_result=lambda result: self._uploaded(image_url, state, target, result)
+        )
+
+    def fetch(self, image_url, width=None):
+        # width asks mainServer for a resized variant (?w=)
+        params = {"w": width} if width else None
+        r = self.session.get(f"{self.server_url}{image_url}", params=params, timeout=FETCH_TIMEOUT)
+        r.raise_for_status()
+        return r.content
+
+    def _uploaded(self, image_url, state, target, result):
+        with self.lock:
+            if result and result.get("photo"):
+                # sizes are smallest → largest; any of them resends the same photo
+                file_id = result["photo"][-1]["file_id"]
+                self.file_ids.put(image_url, file_id)
+                del self.inflight[image_url]
+                waiting = state["waiting"]
+
+            elif state["waiting"] and not state["fetch_failed"]:
+                # this chat refused it (blocked the bot, left the group...): next one
+                retry_with = state["waiting"].pop(0)
+                file_id = None
+
+            else:
+                del self.inflight[image_url]
+                waiting = state["waiting"]
+                file_id = retry_with = None
+
+        if file_id is not None:
+            for chat_id, caption, priority in waiting:
+                self._send_file_id(chat_id, file_id, caption, priority)
+            return
+
+        if retry_with is not None:
+            self._upload(image_url, state, retry_with)
+            return
+
+        # no photo for anyone: the alert itself still goes out
+        print(f"❌ Photo upload failed, sending text to {len(waiting) + 1} chat(s):", image_url)
+        for chat_id, caption, priority in [target] + waiting:
+            self.dispatcher.send_message(chat_id, caption + "\n_(photo unavailable)_", priority)
+
+    def _send_file_id(self, chat_id, file_id, caption, priority):
+        self.reused += 1
+        self.dispatcher.submit("sendPhoto", {
+            "chat_id": chat_id,
+            "photo": file_id,
+            "caption": caption,
+            "parse_mode": "Markdown"
+        }, priority)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "uploads": self.uploads,
+                "reused": self.reused,
+                "cached": len(self.file_ids.items),
+                "inflight": len(self.inflight)
+            }
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# ================= CONFIG =================
+# event fields a subscriber can filter on, per topic
+FILTER_FIELDS = {
+    "vibration": (),
+    "nfc": ("status", "method"),
+    "face": ("status", "camera"),
+}
+MAX_ROUTES = 1024        # memoized (topic, field values) → chat ids
+
+
+def matches(filters, key):
+    # filters: {"status": ["DENIED"], ...}; an absent field lets everything through
+    for field, value in key:
+        allowed = filters.get(field)
+        if allowed and value not in allowed:
+            return False
+    return True
+
+
+# ================= SUBSCRIPTION STORE =================
+class SubscriptionStore:
+    """
+    Telegram chats and their topic subscriptions in SQLite. Every
+    subscribe/unsubscribe is one transaction, and the in-memory topic
+    index is swapped only after it commits. subscribers() answers from
+    precomputed lists per (topic, filtered field values); a change drops
+    those lists and they are rebuilt on the next event.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "chat_id INTEGER PRIMARY KEY, started REAL NOT NULL)"
+        )
+        # (topic, chat_id) is the topic → subscriber index
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS subscriptions ("
+            "topic TEXT NOT NULL, chat_id INTEGER NOT NULL, filters TEXT NOT NULL DEFAULT '{}', "
+            "since REAL NOT NULL, PRIMARY KEY (topic, chat_id)) WITHOUT ROWID"
+        )
+        self.db.commit()
+
+        self.users = {row[0] for row in self.db.execute("SELECT chat_id FROM users")}
+        self.topics = {topic: {} for topic in FILTER_FIELDS}    # topic → {chat_id: filters}
+        for topic, chat_id, filters in self.db.execute("SELECT topic, chat_id, filters FROM subscriptions"):
+            if topic in self.topics:
+                self.topics[topic][chat_id] = json.loads(filters)
+
+        self.routes = {}
+
+    # ---------- users ----------
+    def add_user(self, chat_id):
+        with self.lock:
+            if chat_id in self.users:
+                return False
+            with self.db:
+                self.db.execute(
+                    "INSERT OR IGNORE INTO users (chat_id, started) VALUES (?, ?)",
+                    (chat_id, time.time())
+                )
+            self.users.add(chat_id)
+            return True
+
+    # ---------- subscriptions ----------
+    def _check_topic(self, topic):
+        if topic not in FILTER_FIELDS:
+            raise ValueError(f"unknown topic {topic!r}")
+
+    def _commit_topic(self, topic, chat_id, filters):
+        # copy-on-write: readers keep using the old dicts until the swap
+        subs = dict(self.topics[topic])
+        if filters is None:
+            subs.pop(chat_id, None)
+        else:
+            subs[chat_id] = filters
+        self.topics = {**self.topics, topic: subs}
+        self.routes = {}
+
+    def _write(self, topic, chat_id, filters):
+        with self.db:
+            self.db.execute(
+                "INSERT INTO subscriptions (topic, chat_id, filters, since) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (topic, chat_id) DO UPDATE SET filters = excluded.filters",
+                (topic, chat_id, json.dumps(filters), time.time())
+            )
+        self._commit_topic(topic, chat_id, filters)
+
+    def subscribe(self, chat_id, topic):
+        """Subscribe chat_id to topic; an existing subscription keeps its filters."""
+        self._check_topic(topic)
+        with self.lock:
+            if chat_id in self.topics[topic]:
+                return False
+            with self.db:
+                self.db.execute(
+                    "INSERT INTO subscriptions (topic, chat_id, filters, since) VALUES (?, ?, '{}', ?) "
+                    "ON CONFLICT (topic, chat_id) DO NOTHING",
+                    (topic, chat_id, time.time())
+                )
+            self._commit_topic(topic, chat_id, {})
+            return True
+
+    def clear_filters(self, chat_id, topic):
+        """Back to every event of topic; False if chat_id isn't subscribed to it."""
+        self._check_topic(topic)
+        with self.lock:
+            if not self.topics[topic].get(chat_id):
+                return chat_id in self.topics[topic]
+            self._write(topic, chat_id, {})
+            return True
+
+    def set_filter(self, chat_id, topic, field, values):
+        """Narrow one field of a subscription (values None = any), subscribing if needed."""
+        self._check_topic(topic)
+        if field not in FILTER_FIELDS[topic]:
+            raise ValueError(f"{topic} events can't be filtered by {field!r}")
+
+        with self.lock:
+            filters = dict(self.topics[topic].get(chat_id, {}))
+            if values:
+                filters[field] = list(values)
+            else:
+                filters.pop(field, None)
+            self._write(topic, chat_id, filters)
+
+    def unsubscribe(self, chat_id, topic):
+        self._check_topic(topic)
+        with self.lock:
+            if chat_id not in self.topics[topic]:
+                return False
+            with self.db:
+                self.db.execute(
+                    "DELETE FROM subscriptions WHERE topic = ? AND chat_id = ?",
+                    (topic, chat_id)
+                )
+            self._commit_topic(topic, chat_id, None)
+            return True
+
+    def filters(self, chat_id, topic):
+        return self.topics[topic].get(chat_id)
+
+    # ---------- fan-out ----------
+    def subscribers(self, topic, event=None):
+        """Chat ids whose filters accept this event; one dict lookup once warm."""
+        event = event or {}
+        key = (topic,) + tuple(event.get(f) for f in FILTER_FIELDS[topic])
+
+        routes = self.routes
+        chats = routes.get(key)
+        if chats is None:
+            fields = tuple(zip(FILTER_FIELDS[topic], key[1:]))
+            chats = tuple(
+                chat_id for chat_id, filters in self.topics[topic].items()
+                if matches(filters, fields)
+            )
+            if len(routes) >= MAX_ROUTES:
+                routes.clear()
+            routes[key] = chats
+        return chats
+
+    # ---------- migration ----------
+    def migrate(self, user_files, topic_files):
+        """
+        One-off import of the old append-only /Sub text files (one chat id
+        per line, duplicates allowed) in a single transaction; each file is
+        renamed to *.migrated afterwards so it is never read again.
+        """
+        def read_ids(path):
+            with open(path) as f:
+                return {int(line) for line in (l.strip() for l in f) if line.lstrip("-").isdigit()}
+
+        user_files = [p for p in user_files if os.path.exists(p)]
+        topic_files = {t: p for t, p in topic_files.items() if os.path.exists(p)}
+        if not user_files and not topic_files:
+            return 0
+
+        now = time.time()
+        users = set().union(*(read_ids(p) for p in user_files)) if user_files else set()
+        rows = [(t, chat_id, now) for t, p in topic_files.items() for chat_id in read_ids(p)]
+
+        with self.lock:
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO users (chat_id, started) VALUES (?, ?)",
+                    [(chat_id, now) for chat_id in users]
+                )
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO subscriptions (topic, chat_id, filters, since) VALUES (?, ?, '{}', ?)",
+                    rows
+                )
+            self.users |= users
+            for topic, chat_id, _ in rows:
+                if chat_id not in self.topics[topic]:
+                    self._commit_topic(topic, chat_id, {})
+
+        for path in user_files + list(topic_files.values()):
+            os.replace(path, path + ".migrated")
+
+        print(f"📦 Migrated {len(users)} users and {len(rows)} subscriptions from text files")
+        return len(rows)
+
+    def stats(self):
+        return {
+            "users": len(self.users),
+            "topics": {topic: len(subs) for topic, subs in self.topics.items()},
+            "routes": len(self.routes)
+        }
@@ -0,0 +1,111 @@
+import json
+import time
+import asyncio
+import websockets
+
+import MotorAndNfcAndLcd as nfc
+from doors import DOOR_SEND_TIMEOUT
+
+# ================= CONFIG =================
+# python bench_doors.py
+#   DOOR_CLIENTS local controllers connect on /door/door_NNN, then commands
+#   are timed from send until every targeted client has received them
+DOOR_CLIENTS = 200
+ROUNDS = 50
+PORT = 8799
+
+
+class HungDoor:
+    """A controller whose socket never drains."""
+
+    async def send(self, message):
+        await asyncio.Future()
+
+    async def close(self):
+        pass
+
+
+async def door_client(door_id, received, ready):
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}/door/{door_id}") as ws:
+        ready.release()
+        async for message in ws:
+            received[door_id].set_result(time.perf_counter())
+
+
+async def timed(send, door_ids, received):
+    loop = asyncio.get_running_loop()
+    for d in door_ids:
+        received[d] = loop.create_future()
+
+    start = time.perf_counter()
+    await send(door_ids)
+    sent = time.perf_counter()
+    done = await asyncio.gather(*(received[d] for d in door_ids))
+    return (sent - start) * 1000, (max(done) - start) * 1000
+
+
+async def sequential(door_ids):
+    # the old open_door(): one await per controller, in turn
+    message = json.dumps({"action": "OPEN", "name": "bench"})
+    for d in door_ids:
+        ws = nfc.doors.doors.get(d)
+        if ws is not None:
+            await ws.send(message)
+
+
+async def concurrent(door_ids):
+    await nfc.doors.send(door_ids, {"action": "OPEN", "name": "bench"})
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+
+
+async def main():
+    door_ids = [f"door_{i:03d}" for i in range(DOOR_CLIENTS)]
+    received = {}
+    ready = asyncio.Semaphore(0)
+
+    async with websockets.serve(nfc.handler, "127.0.0.1", PORT):
+        clients = [asyncio.create_task(door_client(d, received, ready)) for d in door_ids]
+        for _ in door_ids:
+            await ready.acquire()
+        while len(nfc.doors.doors) < DOOR_CLIENTS:
+            await asyncio.sleep(0.01)
+
+        print(f"{DOOR_CLIENTS} door clients connected")
+        print(f"{'case':>24} | {'send p50':>8} | {'recv p50':>8} | {'recv p99':>8}  (ms)")
+        print("-" * 62)
+
+        cases = [
+            ("one door (targeted)", concurrent, door_ids[:1]),
+            ("all, sequential (old)", sequential, door_ids),
+            ("all, gather", concurrent, door_ids),
+        ]
+        for label, send, targets in cases:
+            sends, recvs = [], []
+            for _ in range(ROUNDS):
+                s, r = await timed(send, targets, received)
+                sends.append(s)
+                recvs.append(r)
+            (sp50, _), (rp50, rp99) = summary(sends), summary(recvs)
+            print(f"{label:>24} | {sp50:>8.2f} | {rp50:>8.2f} | {rp99:>8.2f}")
+
+        # one hung controller among the targets: bounded by DOOR_SEND_TIMEOUT
+        nfc.doors.register("door_hung", HungDoor())
+        start = time.perf_counter()
+        delivered = await nfc.doors.send(door_ids + ["door_hung"], {"action": "OPEN", "name": "bench"})
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"\nwith one hung door: {sum(delivered.values())}/{len(delivered)} delivered "
+            f"in {elapsed:.0f} ms (timeout {DOOR_SEND_TIMEOUT * 1000:.0f} ms), "
+            f"hung door dropped: {'door_hung' not in nfc.doors.doors}"
+        )
+
+        for c in clients:
+            c.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
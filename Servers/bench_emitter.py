@@ -0,0 +1,98 @@
+import json
+import time
+import threading
+
+from emitter import StateEmitter
+
+# ================= CONFIG =================
+CLIENT_COUNTS = [1, 10, 100]
+DURATION = 3.0        # seconds per run
+RADAR_RATE = 66       # R lines per second (servo step every ~15 ms)
+SENSOR_RATE = 1       # S lines per second
+
+
+# ================= FAKE TRANSPORT =================
+class BenchSocketIO:
+    """Stands in for flask_socketio: one packet encode + send per client."""
+
+    def __init__(self, clients):
+        self.clients = [[] for _ in range(clients)]
+        self.messages = 0
+
+    def emit(self, event, data):
+        for queue in self.clients:
+            queue.append(json.dumps([event, data]))   # python-socketio encodes per sid
+            self.messages += 1
+        for queue in self.clients:
+            queue.clear()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def start_background_task(self, target):
+        threading.Thread(target=target, daemon=True).start()
+
+
+def new_state():
+    return {
+        "radar": {"angle": 0, "distance": 0},
+        "sensors": {"temp": 0.0, "hum": 0.0, "gas": 0, "vib": 0}
+    }
+
+
+# ================= SERIAL FEED =================
+def feed(on_radar, on_sensor):
+    start = time.perf_counter()
+    step = 1.0 / RADAR_RATE
+    angle, direction, n = 15, 1, 0
+
+    while time.perf_counter() - start < DURATION:
+        angle += direction
+        if angle in (15, 165):
+            direction = -direction
+
+        on_radar(angle, 40 + n % 150)
+        if n % (RADAR_RATE // SENSOR_RATE) == 0:
+            on_sensor(24.5 + n % 3, 40.0, 300 + n % 7)
+
+        n += 1
+        time.sleep(max(0.0, start + n * step - time.perf_counter()))
+
+
+def run(clients, coalesced):
+    sio = BenchSocketIO(clients)
+    state = new_state()
+
+    if coalesced:
+        emitter = StateEmitter(sio, state)
+        emitter.start()
+        on_radar = lambda a, d: emitter.update("radar", angle=a, distance=d)
+        on_sensor = lambda t, h, g: emitter.update("sensors", temp=t, hum=h, gas=g)
+    else:
+        # old read_arduino(): whole state emitted on every line
+        def on_radar(a, d):
+            state["radar"].update(angle=a, distance=d)
+            sio.emit("update", state)
+
+        def on_sensor(t, h, g):
+            state["sensors"].update(temp=t, hum=h, gas=g)
+            sio.emit("update", state)
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    feed(on_radar, on_sensor)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+
+    return sio.messages / wall, 100 * cpu / wall
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    print(f"{'clients':>7} | {'mode':>10} | {'msgs/s':>9} | cpu %")
+    print("-" * 42)
+
+    for clients in CLIENT_COUNTS:
+        for coalesced, label in ((False, "per-line"), (True, "20 Hz")):
+            rate, cpu = run(clients, coalesced)
+            print(f"{clients:>7} | {label:>10} | {rate:>9.0f} | {cpu:5.1f}")
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# ================= CONFIG =================
+# python bench_ingest.py [server_url]
+#   posts face events to a running mainServer at each rate and body format
+SERVER_URL = "http://localhost:5000"
+RATES = [10, 100, 500]               # events per second
+FORMATS = ["json", "multipart", "raw"]
+DURATION = 5.0                       # seconds per run
+CLIENT_THREADS = 64
+IMAGE_BYTES = 30_000                 # ≈ one 160x160 JPEG crop
+
+IMAGE = os.urandom(IMAGE_BYTES)
+IMAGE_B64 = base64.b64encode(IMAGE).decode()
+FIELDS = {"name": "BENCH", "status": "unknown", "camera_id": "bench"}
+
+local = threading.local()
+
+
+def session():
+    if not hasattr(local, "session"):
+        local.session = requests.Session()
+    return local.session
+
+
+def post(url, fmt):
+    s = session()
+    if fmt == "json":
+        return s.post(url, json={**FIELDS, "image": IMAGE_B64}, timeout=10)
+    if fmt == "multipart":
+        return s.post(url, data=FIELDS, files={"image": ("face.jpg", IMAGE, "image/jpeg")}, timeout=10)
+    return s.post(url, params=FIELDS, data=IMAGE, headers={"Content-Type": "image/jpeg"}, timeout=10)
+
+
+def one(url, fmt, latencies, errors):
+    start = time.perf_counter()
+    try:
+        r = post(url, fmt)
+        ok = r.status_code < 300
+    except requests.RequestException:
+        ok = False
+    elapsed = time.perf_counter() - start
+
+    if ok:
+        latencies.append(elapsed)
+    else:
+        errors.append(elapsed)
+
+
+def run(url, rate, fmt):
+    latencies, errors = [], []
+    step = 1.0 / rate
+    n = int(rate * DURATION)
+
+    with ThreadPoolExecutor(CLIENT_THREADS) as pool:
+        start = time.perf_counter()
+        for i in range(n):
+            # open loop: send on schedule whether or not earlier requests finished
+            time.sleep(max(0.0, start + i * step - time.perf_counter()))
+            pool.submit(one, url, fmt, latencies, errors)
+        sent_in = time.perf_counter() - start
+
+    return sorted(latencies), len(errors), n / sent_in
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    base = sys.argv[1] if len(sys.argv) > 1 else SERVER_URL
+    url = base.rstrip("/") + "/api/face-event"
+
+    print(f"{'rate':>5} | {'format':>9} | {'sent/s':>7} | {'p50 ms':>7} | {'p99 ms':>7} | errors")
+    print("-" * 58)
+
+    for rate in RATES:
+        for fmt in FORMATS:
+            lat, errors, achieved = run(url, rate, fmt)
+            print(
+                f"{rate:>5} | {fmt:>9} | {achieved:>7.0f} | "
+                f"{percentile(lat, 50) * 1000:>7.1f} | {percentile(lat, 99) * 1000:>7.1f} | {errors}"
+            )
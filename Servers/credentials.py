@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+from datetime import datetime
+
+# ================= CONFIG =================
+RELOAD_INTERVAL = 2.0    # seconds between mtime checks of the credential file
+
+ALL_DAYS = 0b1111111     # Monday = bit 0 … Sunday = bit 6
+
+
+def parse_minutes(hhmm):
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def parse_days(days):
+    if days is None:
+        return ALL_DAYS
+    mask = 0
+    for d in days:
+        mask |= 1 << int(d)
+    return mask
+
+
+def parse_expiry(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+# ================= BADGE =================
+class Badge:
+    """One card: name, optional daily window (minutes, may wrap midnight), weekdays, expiry."""
+
+    __slots__ = ("name", "start", "end", "days", "expires")
+
+    def __init__(self, name, start=None, end=None, days=ALL_DAYS, expires=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.days = days
+        self.expires = expires
+
+    @classmethod
+    def from_entry(cls, entry):
+        # "UID": "Name" is the short form for an always-valid card
+        if isinstance(entry, str):
+            return cls(entry)
+
+        window = entry.get("window")
+        start, end = (parse_minutes(window[0]), parse_minutes(window[1])) if window else (None, None)
+        return cls(
+            entry["name"],
+            start,
+            end,
+            parse_days(entry.get("days")),
+            parse_expiry(entry.get("expires"))
+        )
+
+    def allowed(self, now):
+        if self.expires is not None and now.timestamp() >= self.expires:
+            return "expired"
+        if not self.days >> now.weekday() & 1:
+            return "outside_days"
+        if self.start is not None:
+            minute = now.hour * 60 + now.minute
+            inside = (
+                self.start <= minute < self.end if self.start <= self.end
+                else minute >= self.start or minute < self.end
+            )
+            if not inside:
+                return "outside_window"
+        return None
+
+
+# ================= LOADERS =================
+def load_json(path):
+    """{"users": {uid: name | {name, window: [from, to], days, expires}}, "revoked": [uid]}"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    badges = {uid.upper(): Badge.from_entry(e) for uid, e in data.get("users", {}).items()}
+    revoked = frozenset(uid.upper() for uid in data.get("revoked", []))
+    return badges, revoked
+
+
+def load_sqlite(path):
+    """badges(uid, name, window_from, window_to, days "0,1,2", expires, revoked)"""
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = db.execute(
+            "SELECT uid, name, window_from, window_to, days, expires, revoked FROM badges"
+        ).fetchall()
+    finally:
+        db.close()
+
+    badges, revoked = {}, set()
+    for uid, name, w_from, w_to, days, expires, is_revoked in rows:
+        uid = uid.upper()
+        if is_revoked:
+            revoked.add(uid)
+            continue
+        badges[uid] = Badge(
+            name,
+            parse_minutes(w_from) if w_from else None,
+            parse_minutes(w_to) if w_to else None,
+            parse_days(days.split(",") if days else None),
+            parse_expiry(expires)
+        )
+    return badges, frozenset(revoked)
+
+
+# ================= STORE =================
+class CredentialStore:
+    """
+    UID → Badge dict plus a revocation set, loaded from JSON or SQLite
+    (by extension). A reload builds new objects and swaps one reference,
+    so a tap always sees either the old or the new set, never a mix,
+    and open WebSocket connections are untouched.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.table = ({}, frozenset())   # (badges, revoked), replaced as a whole
+        self.mtime = None
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def load(self):
+        loader = load_sqlite if self.path.endswith((".db", ".sqlite")) else load_json
+        mtime = os.stat(self.path).st_mtime
+
+        table = loader(self.path)
+        self.table = table
+        self.mtime = mtime
+        self.reloads += 1
+        return len(table[0]), len(table[1])
+
+    def check(self, uid, now=None):
+        """(name or None, reason or None); reason None means access granted."""
+        badges, revoked = self.table
+        uid = uid.upper()
+
+        if uid in revoked:
+            return None, "revoked"
+
+        badge = badges.get(uid)
+        if badge is None:
+            return None, "unknown"
+
+        return badge.name, badge.allowed(now or datetime.now())
+
+    def __len__(self):
+        return len(self.table[0])
+
+    async def watch(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(RELOAD_INTERVAL)
+            mtime = self.mtime
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if mtime == self.mtime:
+                    continue
+                # the editor may still be writing; let the file settle once
+                await asyncio.sleep(0.2)
+                # parsing tens of thousands of cards stays off the tap path
+                users, revoked = await loop.run_in_executor(None, self.load)
+                print(f"🔄 Credentials reloaded: {users} cards, {revoked} revoked")
+            except Exception as e:
+                # any bad entry (wrong types included) must not end the watcher:
+                # keep serving the last good table until the file changes again
+                self.mtime = mtime
+                self.reload_errors += 1
+                print("❌ Credential reload failed:", e)
+
+    def stats(self):
+        return {
+            "cards": len(self.table[0]),
+            "revoked": len(self.table[1]),
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "loaded_at": time.ctime(self.mtime) if self.mtime else None
+        }
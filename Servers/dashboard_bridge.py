@@ -0,0 +1,126 @@
+import asyncio
+import bisect
+import socketio
+
+# ================= CONFIG =================
+OUTBOX_SIZE = 200          # oldest dashboard events are dropped past this
+EMIT_TIMEOUT = 2.0         # seconds before an emit counts as failed
+RECONNECT_DELAY = 1.0      # seconds, doubled per failed connect
+RECONNECT_MAX = 30.0
+
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+# ================= LATENCY =================
+class LatencyHistogram:
+    """Fixed-bucket histogram in milliseconds; the last bucket is overflow."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        n = sum(self.counts)
+        if not n:
+            return 0.0
+        rank = p / 100 * n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def stats(self):
+        n = sum(self.counts)
+        labels = [f"≤{b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": n,
+            "avg_ms": round(self.total / n, 2) if n else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max, 2),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+# ================= DASHBOARD BRIDGE =================
+class DashboardBridge:
+    """
+    Socket.IO link to mainServer that never blocks the door handlers:
+    emit() only appends to a bounded outbox, one task connects (with
+    backoff) and drains it. While mainServer is down events wait in the
+    outbox, oldest dropped first.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.sio = socketio.AsyncClient(reconnection=True)
+        self.outbox = asyncio.Queue(OUTBOX_SIZE)
+        self.connected = asyncio.Event()
+
+        self.sio.on("connect", self._on_connect)
+        self.sio.on("disconnect", self._on_disconnect)
+
+        self.sent = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def on(self, event, handler):
+        self.sio.on(event, handler)
+
+    def emit(self, event, data):
+        if self.outbox.full():
+            self.outbox.get_nowait()
+            self.dropped += 1
+        self.outbox.put_nowait((event, data))
+
+    async def _on_connect(self):
+        print("✅ Connected to Main Server (Dashboard)")
+        self.connected.set()
+
+    async def _on_disconnect(self, *args):
+        print("❌ Disconnected from Main Server")
+        self.connected.clear()
+
+    async def _connect(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                await self.sio.connect(self.url, wait_timeout=EMIT_TIMEOUT)
+                return
+            except (socketio.exceptions.ConnectionError, ValueError) as e:
+                print(f"⚠️ Main Server not reachable, retry in {delay:.0f}s:", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+
+    async def run(self):
+        # after the first connect AsyncClient reconnects on its own
+        await self._connect()
+
+        while True:
+            event, data = await self.outbox.get()
+            await self.connected.wait()
+
+            try:
+                await asyncio.wait_for(self.sio.emit(event, data), EMIT_TIMEOUT)
+                self.sent += 1
+            except (asyncio.TimeoutError, socketio.exceptions.SocketIOError) as e:
+                self.failures += 1
+                print("❌ Dashboard emit failed:", event, e)
+
+    def stats(self):
+        return {
+            "connected": self.connected.is_set(),
+            "queued": self.outbox.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failures": self.failures
+        }
@@ -0,0 +1,96 @@
+import json
+import asyncio
+
+from dashboard_bridge import LatencyHistogram
+from ws_paths import connection_path
+
+# ================= CONFIG =================
+DEFAULT_DOOR_ID = "door_01"    # used by controllers connecting on plain "/"
+DOOR_SEND_TIMEOUT = 0.5        # seconds per controller before it is dropped
+
+# which doors a recognized face at each camera opens
+CAMERA_DOORS = {
+    "cam_01": ["door_01"],
+}
+
+
+# ================= HANDSHAKE =================
+def parse_door_path(path):
+    """"/door/<id>" → id; "/" (older sketches) → DEFAULT_DOOR_ID"""
+    parts = path.split("?")[0].strip("/").split("/")
+    if parts[0] == "door" and len(parts) > 1 and parts[1]:
+        return parts[1]
+    return DEFAULT_DOOR_ID
+
+
+# ================= REGISTRY =================
+class DoorRegistry:
+    """
+    door_id → controller websocket, from the connect path. Commands go
+    only to the targeted doors, concurrently, under one DOOR_SEND_TIMEOUT
+    deadline: a hung controller is dropped instead of holding up the rest.
+    """
+
+    def __init__(self):
+        self.doors = {}
+        self.fanout_latency = LatencyHistogram()
+        self.timeouts = 0
+
+    def register(self, door_id, ws):
+        old = self.doors.get(door_id)
+        self.doors[door_id] = ws
+        if old is not None and old is not ws:
+            print(f"⚠️ Door {door_id} reconnected, replacing the old controller")
+        return old
+
+    def unregister(self, door_id, ws):
+        # a replaced controller closing must not remove its successor
+        if self.doors.get(door_id) is ws:
+            del self.doors[door_id]
+
+    def doors_for_camera(self, camera_id):
+        return CAMERA_DOORS.get(camera_id, [])
+
+    def _drop(self, door_id, ws, reason):
+        print(f"❌ Door {door_id} send failed, dropping it:", reason)
+        self.unregister(door_id, ws)
+        asyncio.create_task(ws.close())
+
+    async def send(self, door_ids, command):
+        """Send one command to every listed door; returns {door_id: delivered}."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        message = json.dumps(command)
+
+        delivered = dict.fromkeys(door_ids, False)
+        tasks = {}
+        for door_id in door_ids:
+            ws = self.doors.get(door_id)
+            if ws is not None:
+                tasks[asyncio.ensure_future(ws.send(message))] = (door_id, ws)
+
+        # one shared deadline instead of a wait_for() timer per controller
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=DOOR_SEND_TIMEOUT)
+
+            for task in pending:
+                task.cancel()
+                self.timeouts += 1
+                self._drop(*tasks[task], "timeout")
+
+            for task in done:
+                door_id, ws = tasks[task]
+                if task.exception() is None:
+                    delivered[door_id] = True
+                else:
+                    self._drop(door_id, ws, task.exception())
+
+        self.fanout_latency.observe((loop.time() - start) * 1000)
+        return delivered
+
+    def stats(self):
+        return {
+            "doors": sorted(self.doors),
+            "timeouts": self.timeouts,
+            "fanout": self.fanout_latency.stats()
+        }
@@ -0,0 +1,65 @@
+import copy
+import threading
+
+# ================= CONFIG =================
+EMIT_HZ = 20   # state ticks per second sent to dashboards / bot
+
+
+# ================= STATE EMITTER =================
+class StateEmitter:
+    """
+    Coalesces state changes between ticks and emits only what changed:
+    {"radar": {"angle": 90}} instead of the whole state dict on every line.
+    critical=True (vibration) flushes immediately instead of waiting a tick.
+    """
+
+    def __init__(self, socketio, state, event="update", hz=EMIT_HZ):
+        self.socketio = socketio
+        self.state = state
+        self.event = event
+        self.interval = 1.0 / hz
+
+        self.lock = threading.Lock()
+        self.pending = {}    # channel → {key: value} changed since last emit
+        self.emitted = 0
+
+    def update(self, channel, critical=False, **values):
+        with self.lock:
+            current = self.state[channel]
+            changed = {k: v for k, v in values.items() if current.get(k) != v}
+
+            if changed:
+                current.update(changed)
+                self.pending.setdefault(channel, {}).update(changed)
+
+            delta = self._take() if critical else None
+
+        if delta:
+            self._emit(delta)
+
+    def snapshot(self):
+        with self.lock:
+            return copy.deepcopy(self.state)
+
+    def flush(self):
+        with self.lock:
+            delta = self._take()
+
+        if delta:
+            self._emit(delta)
+
+    def _take(self):
+        delta, self.pending = self.pending, {}
+        return delta
+
+    def _emit(self, delta):
+        self.socketio.emit(self.event, delta)
+        self.emitted += 1
+
+    def run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            self.flush()
+
+    def start(self):
+        self.socketio.start_background_task(self.run)
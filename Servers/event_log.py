@@ -0,0 +1,145 @@
+import time
+import sqlite3
+import threading
+
+# ================= CONFIG =================
+FLUSH_INTERVAL = 1.0     # seconds between batched inserts
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# filterable columns; each has an index on (column, ts) so a filtered page
+# is a range scan of that index, newest first
+FILTERS = ("name", "method", "status", "camera", "uid")
+COLUMNS = ("ts", "method", "status", "name", "uid", "camera", "image_url")
+
+
+def encode_cursor(ts, event_id):
+    return f"{ts!r}_{event_id}"
+
+
+def decode_cursor(cursor):
+    try:
+        ts, event_id = cursor.split("_")
+        return float(ts), int(event_id)
+    except ValueError:
+        raise ValueError(f"invalid cursor {cursor!r}")
+
+
+# ================= ACCESS EVENT LOG =================
+class AccessLog:
+    """
+    Persistent log of FACE and NFC access events in SQLite. add() only
+    appends to a list; a background thread inserts the batch every
+    FLUSH_INTERVAL. Pages are ordered newest first and continue from a
+    (ts, id) cursor, so deep pages cost the same as the first one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY, ts REAL NOT NULL, method TEXT NOT NULL, "
+            "status TEXT NOT NULL, name TEXT, uid TEXT, camera TEXT, image_url TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+        for col in FILTERS:
+            self.db.execute(f"CREATE INDEX IF NOT EXISTS events_{col} ON events ({col}, ts)")
+        self.db.commit()
+
+        self.pending = []
+        self.written = 0
+        self.flushes = 0
+
+    # ---------- ingest ----------
+    def add(self, method, status, name=None, uid=None, camera=None, image_url=None, ts=None):
+        ts = time.time() if ts is None else ts
+        with self.lock:
+            self.pending.append((ts, method, status, name, uid, camera, image_url))
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, []
+        with self.db:
+            self.db.executemany(
+                f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                batch
+            )
+
+        self.written += len(batch)
+        self.flushes += 1
+
+    def run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print("❌ Access log flush error:", e)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    # ---------- queries ----------
+    def page(self, start=None, end=None, cursor=None, limit=PAGE_SIZE, **filters):
+        """
+        Newest-first page of events matching every given filter
+        (name/method/status/camera/uid) with start <= ts < end.
+        Returns {"events": [...], "next": cursor or None}.
+        """
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise ValueError(f"unknown filter {sorted(unknown)[0]!r}")
+
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        where, args = [], []
+
+        for col, value in filters.items():
+            if value is not None:
+                where.append(f"{col} = ?")
+                args.append(value)
+        if start is not None:
+            where.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            args.append(end)
+        if cursor:
+            where.append("(ts, id) < (?, ?)")
+            args.extend(decode_cursor(cursor))
+
+        sql = "SELECT id, " + ", ".join(COLUMNS) + " FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        args.append(limit + 1)
+
+        with self.lock:
+            self._flush()
+            rows = self.db.execute(sql, args).fetchall()
+
+        events = [dict(r) for r in rows[:limit]]
+        more = len(rows) > limit
+        return {
+            "events": events,
+            "next": encode_cursor(events[-1]["ts"], events[-1]["id"]) if more else None
+        }
+
+    def stats(self):
+        with self.lock:
+            return {
+                "written": self.written,
+                "pending": len(self.pending),
+                "flushes": self.flushes
+            }
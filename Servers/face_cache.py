@@ -0,0 +1,143 @@
+import os
+import threading
+from collections import OrderedDict
+
+from face_store import (
+    THUMB_SIZE, content_tag, crop_name, is_thumb, resize_jpeg, thumb_name, cv2
+)
+
+# ================= CONFIG =================
+CACHE_BYTES = 32 * 1024 ** 2      # memory cap for cached crops and variants
+CACHE_ITEM_MAX = 1024 ** 2        # larger images are served but not cached
+VARIANT_SIZES = (64, 96, 128, 256, 512)   # ?w= is rounded up to one of these
+
+
+def variant_size(width):
+    """Allowed variant for a requested ?w=, None for the full crop."""
+    if not width or width <= 0:
+        return None
+    return next((s for s in VARIANT_SIZES if s >= width), None)
+
+
+# ================= LRU =================
+class ByteLRU:
+    """OrderedDict LRU bounded by the total size of its values."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.items = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            data = self.items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > CACHE_ITEM_MAX:
+            return
+
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+
+            self.items[key] = data
+            self.size += len(data)
+
+            while self.size > self.max_bytes:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "items": len(self.items),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# ================= FACE CACHE =================
+class FaceCache:
+    """
+    Reads crops and resized variants for /faces. Crop files never change
+    once written, so a (filename, size) entry stays valid until evicted,
+    and the ETag of a hashed filename needs no disk access at all.
+    """
+
+    def __init__(self, store, max_bytes=CACHE_BYTES):
+        self.store = store
+        self.lru = ByteLRU(max_bytes)
+        self.resized = 0
+
+    def resolve(self, filename, width=None):
+        """(crop filename, variant size or None); .thumb.jpg is the THUMB_SIZE variant."""
+        if is_thumb(filename):
+            return crop_name(filename), THUMB_SIZE
+        return filename, variant_size(width)
+
+    def etag(self, filename, size):
+        tag = content_tag(filename)
+        if tag is None:
+            # older files: no hash in the name, fall back to size + mtime
+            try:
+                st = os.stat(self.store.path(filename))
+            except OSError:
+                return None
+            tag = f"{st.st_size:x}-{int(st.st_mtime):x}"
+        return f"{tag}-{size}" if size else tag
+
+    def put(self, filename, data):
+        self.lru.put((filename, None), data)
+
+    def get(self, filename, size=None):
+        """Bytes of the crop or its variant, None when it doesn't exist."""
+        key = (filename, size)
+        data = self.lru.get(key)
+        if data is not None:
+            return data
+
+        if size and size <= THUMB_SIZE:
+            data = self._read(thumb_name(filename))
+            if data is not None and size < THUMB_SIZE and cv2 is not None:
+                data = resize_jpeg(data, size) or data
+
+        if data is None:
+            original = self.lru.get((filename, None)) or self._read(filename)
+            if original is None:
+                return None
+
+            data = original
+            if size and cv2 is not None:
+                data = resize_jpeg(original, size) or original
+                self.resized += 1
+            if size:
+                self.lru.put((filename, None), original)
+
+        self.lru.put(key, data)
+        return data
+
+    def _read(self, filename):
+        pending = self.store.pending_bytes(filename)
+        if pending is not None:
+            return pending
+
+        try:
+            with open(self.store.path(filename), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def stats(self):
+        return {**self.lru.stats(), "resized": self.resized}
@@ -0,0 +1,299 @@
+import os
+import re
+import time
+import shutil
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:   # thumbnails are skipped, full images still served
+    cv2 = None
+
+# ================= CONFIG =================
+RETENTION_DAYS = 30                # day shards older than this are deleted
+MAX_BYTES = 2 * 1024 ** 3          # oldest day shards go first past this size
+RETENTION_INTERVAL = 3600          # seconds between retention passes
+WRITER_THREADS = 2                 # disk writes for incoming crops
+WRITE_QUEUE = 256                  # crops waiting for a writer before save() refuses
+THUMB_SIZE = 96                    # px, longest side
+THUMB_QUALITY = 80
+
+# <name>_<YYYYmmdd>_<HHMMSS>_<us>[_<sha1[:12]>][.thumb].jpg → stored under faces/<YYYYmmdd>/
+# files saved before content hashing have no _<sha1> part
+FACE_FILE = re.compile(r"_(\d{8})_\d{6}_\d{6}(?:_([0-9a-f]{12}))?(\.thumb)?\.jpg$")
+KNOWN_FILE = re.compile(r"^(.+)_(\d+)\.(?:jpg|jpeg|png)$", re.IGNORECASE)
+THUMB_SUFFIX = ".thumb.jpg"
+
+
+class StoreBusy(Exception):
+    """The writer queue is full; the caller should retry later."""
+
+
+def shard_of(filename):
+    m = FACE_FILE.search(filename)
+    return m.group(1) if m else None
+
+
+def content_tag(filename):
+    """sha1 prefix embedded in the filename, None for older files."""
+    m = FACE_FILE.search(filename)
+    return m.group(2) if m else None
+
+
+def thumb_name(filename):
+    return filename[:-len(".jpg")] + THUMB_SUFFIX
+
+
+def is_thumb(filename):
+    return filename.endswith(THUMB_SUFFIX)
+
+
+def crop_name(filename):
+    return filename[:-len(THUMB_SUFFIX)] + ".jpg" if is_thumb(filename) else filename
+
+
+def resize_jpeg(img_bytes, size):
+    """JPEG scaled down to fit size x size (never up); None if undecodable."""
+    img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return None
+
+    h, w = img.shape[:2]
+    scale = size / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))),
+                         interpolation=cv2.INTER_AREA)
+
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, THUMB_QUALITY])
+    return buf.tobytes() if ok else None
+
+
+# ================= FACE CROPS =================
+class FaceStore:
+    """
+    Face crops sharded into one directory per day, named so the shard
+    follows from the filename: /faces/<filename> URLs stay flat and
+    old flat files keep resolving. save() only reserves the name: bytes
+    go to a bounded writer pool and are served from memory until on disk.
+    Thumbnails are written by one worker thread; retention drops whole day
+    directories by age, then by size.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.day_bytes = {}           # shard → bytes, filled by the first retention pass
+        self.day_dirs = set()
+        self.pending = {}             # filename → bytes reserved but not written yet
+        self.slots = threading.BoundedSemaphore(WRITE_QUEUE)
+        self.writers = ThreadPoolExecutor(max_workers=WRITER_THREADS, thread_name_prefix="faces")
+        self.thumbs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbs")
+
+        self.saved = 0
+        self.busy = 0
+        self.write_errors = 0
+        self.thumbs_made = 0
+        self.deleted_days = 0
+        self.migrated = 0
+
+    def path(self, filename):
+        """Path of a crop or thumbnail; flat legacy files until migrated."""
+        filename = os.path.basename(filename)
+        day = shard_of(filename)
+        if day:
+            sharded = os.path.join(self.root, day, filename)
+            if os.path.exists(sharded):
+                return sharded
+        return os.path.join(self.root, filename)
+
+    def pending_bytes(self, filename):
+        with self.lock:
+            return self.pending.get(filename)
+
+    def save(self, name, img_bytes, now=None):
+        """Reserve a filename and queue the write; raises StoreBusy when full."""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.busy += 1
+            raise StoreBusy()
+
+        now = now or datetime.now()
+        ts = now.strftime("%Y%m%d_%H%M%S_%f")
+        digest = hashlib.sha1(img_bytes).hexdigest()[:12]
+        filename = f"{name.replace(' ', '_')}_{ts}_{digest}.jpg"
+
+        with self.lock:
+            self.pending[filename] = img_bytes
+
+        self.writers.submit(self._write, ts[:8], filename, img_bytes)
+        return filename, ts
+
+    def _write(self, day, filename, img_bytes):
+        day_dir = os.path.join(self.root, day)
+
+        try:
+            if day not in self.day_dirs:
+                os.makedirs(day_dir, exist_ok=True)
+                self.day_dirs.add(day)
+
+            with open(os.path.join(day_dir, filename), "wb") as f:
+                f.write(img_bytes)
+
+            with self.lock:
+                self.day_bytes[day] = self.day_bytes.get(day, 0) + len(img_bytes)
+                self.saved += 1
+
+        except OSError as e:
+            print("❌ Face write error:", filename, e)
+            with self.lock:
+                self.write_errors += 1
+
+        finally:
+            with self.lock:
+                self.pending.pop(filename, None)
+            self.slots.release()
+
+        if cv2 is not None:
+            self.thumbs.submit(self._thumbnail, day_dir, filename, img_bytes)
+
+    def _thumbnail(self, day_dir, filename, img_bytes):
+        try:
+            buf = resize_jpeg(img_bytes, THUMB_SIZE)
+            if buf is None:
+                return
+
+            with open(os.path.join(day_dir, thumb_name(filename)), "wb") as f:
+                f.write(buf)
+
+            with self.lock:
+                day = os.path.basename(day_dir)
+                self.day_bytes[day] = self.day_bytes.get(day, 0) + len(buf)
+                self.thumbs_made += 1
+
+        except Exception as e:
+            print("❌ Thumbnail error:", filename, e)
+
+    # ---------- retention ----------
+    def compact(self):
+        """Move flat legacy files into day shards."""
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+
+                day = shard_of(entry.name)
+                if not day:
+                    continue
+
+                os.makedirs(os.path.join(self.root, day), exist_ok=True)
+                os.replace(entry.path, os.path.join(self.root, day, entry.name))
+                self.migrated += 1
+
+    def scan(self):
+        day_bytes = {}
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_dir() and entry.name.isdigit():
+                    with os.scandir(entry.path) as files:
+                        day_bytes[entry.name] = sum(f.stat().st_size for f in files if f.is_file())
+
+        with self.lock:
+            self.day_bytes = day_bytes
+
+    def enforce(self, now=None):
+        now = now or datetime.now()
+        cutoff = (now - timedelta(days=RETENTION_DAYS)).strftime("%Y%m%d")
+        today = now.strftime("%Y%m%d")
+
+        with self.lock:
+            days = sorted(self.day_bytes)
+            total = sum(self.day_bytes.values())
+
+        doomed = []
+        for day in days:
+            if day == today:
+                break
+            if day < cutoff or total > MAX_BYTES:
+                doomed.append(day)
+                total -= self.day_bytes.get(day, 0)
+
+        for day in doomed:
+            shutil.rmtree(os.path.join(self.root, day), ignore_errors=True)
+            with self.lock:
+                self.day_bytes.pop(day, None)
+                self.day_dirs.discard(day)
+                self.deleted_days += 1
+
+        return doomed
+
+    def run(self):
+        while True:
+            try:
+                self.compact()
+                self.scan()
+                doomed = self.enforce()
+                if doomed:
+                    print(f"🧹 Face retention removed {len(doomed)} day(s):", ", ".join(doomed))
+            except OSError as e:
+                print("❌ Face retention error:", e)
+            time.sleep(RETENTION_INTERVAL)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "saved": self.saved,
+                "pending": len(self.pending),
+                "busy": self.busy,
+                "write_errors": self.write_errors,
+                "thumbnails": self.thumbs_made,
+                "days": len(self.day_bytes),
+                "bytes": sum(self.day_bytes.values()),
+                "deleted_days": self.deleted_days,
+                "migrated": self.migrated
+            }
+
+
+# ================= KNOWN FACES =================
+class KnownFaceIndex:
+    """
+    Highest <name>_<n> index per name in known_faces/, scanned once; the
+    next enrollment filename is then a dict lookup instead of a listdir.
+    The scan also drops .part copies left by an interrupted add-known.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.last = {}
+
+        for f in os.listdir(root):
+            if f.endswith(".part"):
+                os.remove(os.path.join(root, f))
+                continue
+            m = KNOWN_FILE.match(f)
+            if m:
+                name, n = m.group(1), int(m.group(2))
+                self.last[name] = max(self.last.get(name, 0), n)
+
+    def next_filename(self, name):
+        with self.lock:
+            n = self.last.get(name, 0) + 1
+            # files dropped in by hand since startup
+            while os.path.exists(os.path.join(self.root, f"{name}_{n}.jpg")):
+                n += 1
+            self.last[name] = n
+            return f"{name}_{n}.jpg"
+
+    def last_indices(self):
+        # highest file index per name, not an image count (files may be deleted)
+        with self.lock:
+            return dict(self.last)
@@ -1,13 +1,21 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file
 from flask_socketio import SocketIO
-import serial
-import threading
-import time
 import base64
+import io
+import json
 import os
 import shutil
-from datetime import datetime
+import time
 from flask_cors import CORS
+
+from emitter import StateEmitter
+from event_log import AccessLog, FILTERS as EVENT_FILTERS
+from face_store import FaceStore, KnownFaceIndex, StoreBusy, thumb_name
+from face_cache import FaceCache
+from radar import RadarSweep
+from sensor_history import SensorHistory
+from serial_ingest import SerialIngest
+from timers import TimerScheduler
 # ================= FILE SYSTEM =================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -18,9 +26,14 @@ KNOWN_FACES_DIR = os.path.join(ESPCAM_DIR, "known_faces")
 os.makedirs(FACES_DIR, exist_ok=True)
 os.makedirs(KNOWN_FACES_DIR, exist_ok=True)
 
+SENSOR_DB = os.path.join(BASE_DIR, "sensor_history.db")
+ACCESS_DB = os.path.join(BASE_DIR, "access_events.db")
+
 # ================= CONFIG =================
 SERIAL_PORT = "COM9"      # عدل حسب جهازك
 BAUD_RATE = 9600
+SERIAL_CAPTURE = None     # e.g. "serial_capture.bin" to record raw bytes for replay_serial.py
+VIB_RESET = 0.5           # seconds vib stays 1 after the last V line
 
 # ================= FLASK =================
 app = Flask(__name__)
@@ -35,15 +48,6 @@ socketio = SocketIO(
 
 
 
-# ================= SERIAL =================
-try:
-    arduino = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
-    print(f"✅ Arduino connected on {SERIAL_PORT}")
-except Exception as e:
-    arduino = None
-    print("⚠️ Arduino not connected:", e)
-
-
 # ================= GLOBAL STATE =================
 state = {
     "radar": {
@@ -59,14 +63,33 @@ state = {
 }
 
 # ================= HELPERS =================
-def emit_update():
-    socketio.emit("update", state)
+# serial lines only mark state dirty; the emitter sends deltas at EMIT_HZ
+emitter = StateEmitter(socketio, state)
+
+# per-angle distances; emitted as one binary frame per servo revolution
+radar_sweep = RadarSweep()
+
+# S / V history with 1 min and 1 h rollups, batched to SQLite
+sensor_history = SensorHistory(SENSOR_DB)
+
+# face crops in day shards + thumbnails + retention; O(1) known-face naming
+face_store = FaceStore(FACES_DIR)
+known_index = KnownFaceIndex(KNOWN_FACES_DIR)
+
+# recent crops and ?w= variants in memory; /faces URLs are immutable
+face_cache = FaceCache(face_store)
+FACE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# every FACE / NFC access event, batched to SQLite, paged by /api/events
+access_log = AccessLog(ACCESS_DB)
 
 # ================= SOCKET EVENTS =================
 @socketio.on("connect")
 def on_connect():
     print("🟢 Web Client Connected")
-    emit_update()
+    # full state to the new client only, everyone else keeps getting deltas
+    socketio.emit("update", emitter.snapshot(), to=request.sid)
+    socketio.emit("radar_sweep", radar_sweep.full_frame(), to=request.sid)
 
 @socketio.on("disconnect")
 def on_disconnect():
@@ -77,49 +100,225 @@ def handle_nfc_event(data):
     print("📡 NFC EVENT RECEIVED:", data)
     socketio.emit("nfc_event", data)
 
-# ================= FACE EVENT API =================
-@app.route("/api/face-event", methods=["POST"])
-def face_event():
-    data = request.json or {}
-
-    name = data.get("name", "UNKNOWN")
-    status = data.get("status", "unknown")
-    image_b64 = data.get("image")
-    camera_id = data.get("camera_id", "cam_01")
-
-    if not image_b64:
-        return jsonify({"error": "no image"}), 400
-
-    try:
-        img_bytes = base64.b64decode(image_b64)
-    except Exception:
-        return jsonify({"error": "invalid image"}), 400
-
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    safe_name = name.replace(" ", "_")
-    filename = f"{safe_name}_{ts}.jpg"
-    path = os.path.join(FACES_DIR, filename)
+    # FACE door openings are already logged from their face_event
+    if data.get("method", "NFC") == "NFC":
+        access_log.add(
+            "NFC",
+            data.get("status", "UNKNOWN"),
+            name=data.get("name"),
+            uid=data.get("uid")
+        )
 
-    with open(path, "wb") as f:
-        f.write(img_bytes)
+# ================= FACE EVENT API =================
+# the crop is only queued for the writer pool; the URL works right away
+# (served from memory until written), so the event goes out before any disk I/O
+def store_face_event(camera_id, name, status, img_bytes):
+    filename, ts = face_store.save(name, img_bytes)
+    face_cache.put(filename, img_bytes)
 
     event = {
         "camera": camera_id,
         "name": name,
         "status": status,
         "image_url": f"/faces/{filename}",
+        "thumb_url": f"/faces/{thumb_name(filename)}",
         "time": ts
     }
 
+    access_log.add(
+        "FACE",
+        status,
+        name=name,
+        camera=camera_id,
+        image_url=event["image_url"]
+    )
+
     # بث الحدث للويب
     socketio.emit("face_event", event)
+    return event
+
+def busy_response(**extra):
+    response = jsonify({"error": "busy", **extra})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+# one event, three body formats:
+#   json:      {"name", "status", "camera_id", "image": base64}
+#   multipart: form fields name/status/camera_id + file part "image"
+#   raw:       image/jpeg or application/octet-stream body, fields in the query string
+@app.route("/api/face-event", methods=["POST"])
+def face_event():
+    if request.is_json:
+        data = request.json or {}
+        try:
+            img_bytes = base64.b64decode(data.get("image") or "", validate=True)
+        except Exception:
+            return jsonify({"error": "invalid image"}), 400
+    elif request.files or request.form:
+        data = request.form
+        img_bytes = request.files["image"].read() if "image" in request.files else b""
+    else:
+        data = request.args
+        img_bytes = request.get_data(cache=False)
+
+    if not img_bytes:
+        return jsonify({"error": "no image"}), 400
+
+    try:
+        event = store_face_event(
+            data.get("camera_id", "cam_01"),
+            data.get("name", "UNKNOWN"),
+            data.get("status", "unknown"),
+            img_bytes
+        )
+    except StoreBusy:
+        return busy_response()
+
+    return jsonify({"status": "ok", "image_url": event["image_url"]}), 202
+
+# batch of events from EspCam:
+#   multipart: form field "events" = JSON list, each "image" names a file part
+#   json:      list of events with base64 "image"
+@app.route("/api/face-events", methods=["POST"])
+def face_events():
+    try:
+        if request.files:
+            events = json.loads(request.form.get("events", "[]"))
+            images = [
+                request.files[e["image"]].read() if e.get("image") in request.files else None
+                for e in events
+            ]
+        else:
+            events = request.json or []
+            images = [
+                base64.b64decode(e["image"]) if e.get("image") else None
+                for e in events
+            ]
+    except Exception:
+        return jsonify({"error": "invalid batch"}), 400
 
-    return jsonify({"status": "ok"})
+    stored = 0
+    refused = []       # batch indices the writer pool had no room for
+    for i, (e, img_bytes) in enumerate(zip(events, images)):
+        if not img_bytes:
+            continue
+        try:
+            store_face_event(
+                e.get("camera_id", "cam_01"),
+                e.get("name", "UNKNOWN"),
+                e.get("status", "unknown"),
+                img_bytes
+            )
+            stored += 1
+        except StoreBusy:
+            refused.append(i)
+
+    # nothing taken: let the sender retry the batch; partial: say which to resend
+    if refused and not stored:
+        return busy_response(stored=0, busy=len(refused))
+
+    return jsonify({
+        "status": "ok",
+        "stored": stored,
+        "busy": len(refused),
+        "refused": refused
+    }), 202
+
+# ================= ACCESS EVENTS API =================
+# /api/events?from=&to=&name=&method=FACE|NFC&status=&camera=&uid=&limit=&cursor=
+#   newest first; pass the returned "next" as cursor for the following page
+@app.route("/api/events")
+def events_api():
+    args = request.args
+    try:
+        return jsonify(access_log.page(
+            start=float(args["from"]) if "from" in args else None,
+            end=float(args["to"]) if "to" in args else None,
+            cursor=args.get("cursor"),
+            limit=int(args.get("limit", 50)),
+            **{col: args.get(col) for col in EVENT_FILTERS}
+        ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/events/stats")
+def events_stats():
+    return jsonify(access_log.stats())
+
+# ================= SERIAL STATS API =================
+@app.route("/api/serial/stats")
+def serial_stats():
+    return jsonify(serial_ingest.stats())
+
+# ================= SENSOR HISTORY API =================
+# /api/sensors/history?from=<unix s>&to=<unix s>&resolution=raw|1m|1h|auto
+@app.route("/api/sensors/history")
+def sensors_history():
+    try:
+        end = float(request.args.get("to", time.time()))
+        start = float(request.args.get("from", end - 86400))
+        return jsonify(sensor_history.query(
+            start,
+            end,
+            request.args.get("resolution", "auto")
+        ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/sensors/history/stats")
+def sensors_history_stats():
+    return jsonify(sensor_history.stats())
+
+# ================= RADAR SWEEP API =================
+@app.route("/api/radar/sweep")
+def radar_sweep_api():
+    if request.args.get("format") == "json":
+        return jsonify(radar_sweep.snapshot())
+
+    return Response(
+        radar_sweep.full_frame(),
+        mimetype="application/octet-stream"
+    )
 
 # ================= SERVE FACE IMAGES =================
+# /faces/<file>           full crop
+# /faces/<file>?w=128     resized to fit 128 px (rounded up to a cached size)
+# /faces/<stem>.thumb.jpg the 96 px thumbnail
 @app.route("/faces/<filename>")
 def serve_face(filename):
-    return send_from_directory(FACES_DIR, filename)
+    filename, size = face_cache.resolve(filename, request.args.get("w", type=int))
+
+    etag = face_cache.etag(filename, size)
+    if etag is None:
+        return jsonify({"error": "not found"}), 404
+
+    # revalidation answered from the tag alone, before any bytes are loaded
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+    else:
+        data = face_cache.get(filename, size)
+        if data is None:
+            return jsonify({"error": "not found"}), 404
+        # conditional=True keeps Range / If-Range (206) working on the cached bytes
+        response = send_file(
+            io.BytesIO(data),
+            mimetype="image/jpeg",
+            conditional=True,
+            etag=etag
+        )
+
+    response.headers["Cache-Control"] = FACE_CACHE_CONTROL
+    return response
+
+@app.route("/api/faces/stats")
+def faces_stats():
+    return jsonify({
+        **face_store.stats(),
+        "cache": face_cache.stats(),
+        "known_last_index": known_index.last_indices()
+    })
 
 @app.route("/api/add-known", methods=["POST"])
 def add_known():
@@ -132,88 +331,86 @@ def add_known():
         if not name or not image_url:
             return jsonify({"error": "missing data"}), 400
 
-        filename = os.path.basename(image_url)
-        src_path = os.path.join(FACES_DIR, filename)
+        src_path = face_store.path(image_url)
 
         if not os.path.exists(src_path):
             return jsonify({"error": "source image not found"}), 404
 
-        existing = [
-            f for f in os.listdir(KNOWN_FACES_DIR)
-            if f.startswith(f"{name}_")
-        ]
-
-        new_index = len(existing) + 1
-        dest_path = os.path.join(
-            KNOWN_FACES_DIR,
-            f"{name}_{new_index}.jpg"
-        )
+        saved_as = known_index.next_filename(name)
+        dest_path = os.path.join(KNOWN_FACES_DIR, saved_as)
 
-        shutil.copy(src_path, dest_path)
+        # copy then rename, so EspCam's watcher never sees a half-written file
+        tmp_path = dest_path + ".part"
+        shutil.copy(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
 
         return jsonify({
             "status": "ok",
-            "saved_as": f"{name}_{new_index}.jpg"
+            "saved_as": saved_as
         })
 
     except Exception as e:
         print("❌ ADD KNOWN ERROR:", e)
         return jsonify({"error": "server error"}), 500
 
-# ================= SERIAL THREAD =================
-def read_arduino():
-    print("📡 Serial thread started")
-    while True:
-        try:
-            line = arduino.readline().decode(errors="ignore").strip()
-            if not line:
-                continue
-
-            parts = line.split(",")
-
-            # ================= RADAR =================
-            # R,angle,distance
-            if parts[0] == "R" and len(parts) == 3:
-                state["radar"]["angle"] = int(parts[1])
-                state["radar"]["distance"] = int(parts[2])
-                emit_update()
-
-            # ================= SENSORS =================
-            # S,temp,hum,gas
-            elif parts[0] == "S" and len(parts) == 4:
-                state["sensors"]["temp"] = float(parts[1])
-                state["sensors"]["hum"] = float(parts[2])
-                state["sensors"]["gas"] = int(parts[3])
-                emit_update()
-
-            # ================= VIBRATION EVENT =================
-            # V,1
-            elif parts[0] == "V":
-                state["sensors"]["vib"] = 1
-                emit_update()
-
-                def reset_vibration():
-                    time.sleep(0.5)
-                    state["sensors"]["vib"] = 0
-                    emit_update()
-
-                threading.Thread(
-                    target=reset_vibration,
-                    daemon=True
-                ).start()
-
-        except Exception as e:
-            print("❌ Serial Error:", e)
-            time.sleep(1)
+# ================= SERIAL INGEST =================
+# one timer thread for vibration resets: a new V just moves the deadline
+timers = TimerScheduler()
+
+def reset_vibration():
+    emitter.update("sensors", critical=True, vib=0)
+
+def handle_serial(record):
+    kind = record[0]
+
+    # ================= RADAR =================
+    # R,angle,distance
+    if kind == "R":
+        frame = radar_sweep.update(record[1], record[2])
+
+        if frame:
+            socketio.emit("radar_sweep", frame)
+            emitter.update(
+                "radar",
+                angle=radar_sweep.angle,
+                distance=radar_sweep.nearest()
+            )
+
+    # ================= SENSORS =================
+    # S,temp,hum,gas
+    elif kind == "S":
+        emitter.update(
+            "sensors",
+            temp=record[1],
+            hum=record[2],
+            gas=record[3]
+        )
+        sensor_history.record(record[1], record[2], record[3])
+
+    # ================= VIBRATION EVENT =================
+    # V,1
+    elif kind == "V":
+        emitter.update("sensors", critical=True, vib=1)
+        sensor_history.record_vibration()
+        timers.schedule("vib", VIB_RESET, reset_vibration)
+
+serial_ingest = SerialIngest(
+    SERIAL_PORT,
+    BAUD_RATE,
+    handle_serial,
+    capture_path=SERIAL_CAPTURE
+)
 
 # ================= MAIN =================
 if __name__ == "__main__":
     print("🚀 Starting Smart Monitoring Server")
 
-    threading.Thread(
-        target=read_arduino,
-        daemon=True
-    ).start()
+    emitter.start()
+    timers.start()
+    sensor_history.start()
+    access_log.start()
+    face_store.start()
+    serial_ingest.start()
 
     socketio.run(
         app,
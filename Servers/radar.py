@@ -0,0 +1,88 @@
+import sys
+import time
+import struct
+import threading
+from array import array
+
+# ================= CONFIG =================
+RADAR_ANGLES = 181      # servo angles 0..180, one slot each
+SWEEP_SLICE = None      # seconds; also emit partial frames this often (None = per revolution)
+MAX_DISTANCE = 0xFFFF
+
+# frame = header + little-endian uint16 distance per angle in [start, end]
+#   start, end, angle (last servo angle), flags (bit 0: full revolution), seq
+FRAME_HEADER = struct.Struct("<BBBBI")
+FLAG_REVOLUTION = 1
+
+
+# ================= SWEEP BUFFER =================
+class RadarSweep:
+    """
+    Fixed array('H') of the latest distance per angle, updated in place by
+    the serial thread. A frame (the changed angle range, or the whole sweep)
+    is produced when the servo reverses or SWEEP_SLICE elapses.
+    """
+
+    def __init__(self):
+        self.distances = array("H", [0] * RADAR_ANGLES)
+        self.lock = threading.Lock()
+
+        self.angle = 0
+        self.direction = 0
+        self.seq = 0
+        self.dirty = None          # (lo, hi) angles changed since last frame
+        self.last_frame = time.time()
+
+    def update(self, angle, distance):
+        """Store one reading; returns a frame (bytes) when one is due, else None."""
+        if not 0 <= angle < RADAR_ANGLES:
+            return None
+
+        with self.lock:
+            self.distances[angle] = max(0, min(distance, MAX_DISTANCE))
+
+            lo, hi = self.dirty or (angle, angle)
+            self.dirty = (min(lo, angle), max(hi, angle))
+
+            step = (angle > self.angle) - (angle < self.angle)
+            reversed_ = step != 0 and self.direction != 0 and step != self.direction
+            if step:
+                self.direction = step
+            self.angle = angle
+
+            if reversed_:
+                return self._frame(0, RADAR_ANGLES - 1, FLAG_REVOLUTION)
+
+            if SWEEP_SLICE and time.time() - self.last_frame >= SWEEP_SLICE:
+                return self._frame(*self.dirty, 0)
+
+        return None
+
+    def full_frame(self):
+        with self.lock:
+            return self._encode(0, RADAR_ANGLES - 1, FLAG_REVOLUTION)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "angle": self.angle,
+                "seq": self.seq,
+                "distances": self.distances.tolist()
+            }
+
+    def nearest(self):
+        with self.lock:
+            return min((d for d in self.distances if d > 0), default=0)
+
+    def _frame(self, lo, hi, flags):
+        self.dirty = None
+        self.seq += 1
+        self.last_frame = time.time()
+        return self._encode(lo, hi, flags)
+
+    def _encode(self, lo, hi, flags):
+        body = self.distances[lo:hi + 1]
+        if sys.byteorder == "big":
+            body = array("H", body)
+            body.byteswap()
+        return FRAME_HEADER.pack(lo, hi, self.angle, flags, self.seq) + body.tobytes()
@@ -0,0 +1,113 @@
+import io
+import sys
+import time
+import random
+
+from serial_ingest import LineParser
+
+# ================= CONFIG =================
+# python replay_serial.py [capture.bin]
+#   capture.bin: raw bytes recorded with SERIAL_CAPTURE in mainServer.py
+#   no file:     SYNTHETIC_LINES of generated Arduino output
+SYNTHETIC_LINES = 200_000
+MAX_CHUNK = 256          # replayed in random 1..MAX_CHUNK byte reads, like in_waiting
+ROUNDS = 3
+
+random.seed(7)
+
+
+def synthetic_capture(n):
+    out = [b"SYSTEM READY\r\n"]
+    angle, direction = 15, 1
+
+    for i in range(n):
+        angle += direction
+        if angle in (15, 165):
+            direction = -direction
+        out.append(b"R,%d,%d\r\n" % (angle, 20 + i % 300))
+
+        if i % 66 == 0:
+            out.append(b"S,%.1f,%.1f,%d\r\n" % (24 + i % 5 / 10, 41.0, 300 + i % 40))
+        if i % 5000 == 0:
+            out.append(b"V,1\r\n")
+        if i % 20000 == 0:
+            out.append(b"R,9\xff,garbage\r\n")   # line noise
+
+    return b"".join(out)
+
+
+def chunks(data):
+    i = 0
+    while i < len(data):
+        n = random.randint(1, MAX_CHUNK)
+        yield data[i:i + n]
+        i += n
+
+
+# ================= OLD PATH =================
+class ByteAtATime(io.RawIOBase):
+    # pyserial's Serial.readline() is io.RawIOBase.readline → read(1) per byte
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self.data) - self.pos)
+        b[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+
+# what read_arduino() did per readline(): decode, strip, split, convert
+def old_parse(data):
+    port = ByteAtATime(data)
+    parsed = 0
+    for raw in iter(port.readline, b""):
+        line = raw.decode(errors="ignore").strip()
+        if not line:
+            continue
+        parts = line.split(",")
+        try:
+            if parts[0] == "R" and len(parts) == 3:
+                int(parts[1]), int(parts[2])
+            elif parts[0] == "S" and len(parts) == 4:
+                float(parts[1]), float(parts[2]), int(parts[3])
+            parsed += 1
+        except ValueError:
+            pass
+    return parsed
+
+
+# ================= MAIN =================
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_capture(SYNTHETIC_LINES)
+
+    pieces = list(chunks(data))
+    mb = len(data) / 1e6
+
+    best_new = best_old = float("inf")
+    for _ in range(ROUNDS):
+        parser = LineParser()
+        records = 0
+        start = time.perf_counter()
+        for piece in pieces:
+            records += len(parser.feed(piece))
+        best_new = min(best_new, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        old_parse(data)
+        best_old = min(best_old, time.perf_counter() - start)
+
+    print(f"capture: {mb:.2f} MB, {parser.lines} lines, {len(pieces)} reads")
+    print(f"records: {records}  parse_errors: {parser.parse_errors}  unknown: {parser.unknown}")
+    print(f"{'path':>16} | {'seconds':>8} | {'lines/s':>10} | MB/s")
+    print("-" * 50)
+    for label, secs in (("readline+split", best_old), ("LineParser", best_new)):
+        print(f"{label:>16} | {secs:>8.3f} | {parser.lines / secs:>10.0f} | {mb / secs:.1f}")
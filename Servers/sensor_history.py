@@ -0,0 +1,248 @@
+import os
+import time
+import sqlite3
+import threading
+
+# ================= CONFIG =================
+FLUSH_INTERVAL = 2.0        # seconds between batched writes
+RAW_RETENTION = 7 * 86400   # seconds of raw S/V points kept; rollups are kept forever
+MAX_POINTS = 2000           # resolution=auto picks the finest rollup under this
+RAW_AUTO_SPAN = 1800        # seconds; shorter ranges get raw points (S is ~1 Hz)
+
+METRICS = ("temp", "hum", "gas")
+
+# rollup levels: name → bucket width in seconds
+RESOLUTIONS = {
+    "1m": 60,
+    "1h": 3600,
+}
+
+
+def _rollup_columns():
+    cols = ["bucket INTEGER PRIMARY KEY", "n INTEGER NOT NULL"]
+    for m in METRICS:
+        cols += [f"{m}_min REAL", f"{m}_max REAL", f"{m}_sum REAL"]
+    cols.append("vib INTEGER NOT NULL")
+    return ", ".join(cols)
+
+
+def _rollup_upsert(table):
+    names = ["bucket", "n"] + [f"{m}_{a}" for m in METRICS for a in ("min", "max", "sum")] + ["vib"]
+
+    merge = ["n = n + excluded.n", "vib = vib + excluded.vib"]
+    for m in METRICS:
+        # min()/max() with a NULL argument are NULL in SQLite, hence coalesce
+        merge += [
+            f"{m}_min = min(coalesce({m}_min, excluded.{m}_min), coalesce(excluded.{m}_min, {m}_min))",
+            f"{m}_max = max(coalesce({m}_max, excluded.{m}_max), coalesce(excluded.{m}_max, {m}_max))",
+            f"{m}_sum = coalesce({m}_sum, 0) + coalesce(excluded.{m}_sum, 0)",
+        ]
+
+    return (
+        f"INSERT INTO {table} ({', '.join(names)}) "
+        f"VALUES ({', '.join('?' * len(names))}) "
+        f"ON CONFLICT(bucket) DO UPDATE SET {', '.join(merge)}"
+    )
+
+
+class _Bucket:
+    __slots__ = ("n", "stats", "vib")
+
+    def __init__(self):
+        self.n = 0
+        self.stats = {m: None for m in METRICS}   # metric → [min, max, sum]
+        self.vib = 0
+
+    def add(self, values):
+        self.n += 1
+        for m in METRICS:
+            v = values[m]
+            s = self.stats[m]
+            if s is None:
+                self.stats[m] = [v, v, v]
+            else:
+                if v < s[0]:
+                    s[0] = v
+                if v > s[1]:
+                    s[1] = v
+                s[2] += v
+
+    def row(self, bucket):
+        row = [bucket, self.n]
+        for m in METRICS:
+            row += self.stats[m] or [None, None, None]
+        row.append(self.vib)
+        return row
+
+
+# ================= SENSOR HISTORY =================
+class SensorHistory:
+    """
+    Time-series store for the S (temp/hum/gas) and V (vibration) streams.
+    Points and 1 min / 1 h min-max-avg rollups are aggregated in memory and
+    written to SQLite in one transaction every FLUSH_INTERVAL, so a history
+    query reads at most MAX_POINTS pre-aggregated rows, never the raw points.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS raw "
+            f"(ts REAL NOT NULL, {', '.join(f'{m} REAL' for m in METRICS)}, vib INTEGER)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS raw_ts ON raw (ts)")
+        for name in RESOLUTIONS:
+            self.db.execute(
+                f"CREATE TABLE IF NOT EXISTS rollup_{name} ({_rollup_columns()}) WITHOUT ROWID"
+            )
+        self.db.commit()
+
+        self.upserts = {name: _rollup_upsert(f"rollup_{name}") for name in RESOLUTIONS}
+
+        # unflushed data
+        self.raw = []                                    # (ts, temp, hum, gas, vib)
+        self.buckets = {name: {} for name in RESOLUTIONS}   # name → {bucket: _Bucket}
+
+        self.points = 0
+        self.flushes = 0
+        self.last_prune = 0.0
+
+    # ---------- ingest ----------
+    def record(self, temp, hum, gas, ts=None):
+        ts = time.time() if ts is None else ts
+        values = {"temp": temp, "hum": hum, "gas": gas}
+
+        with self.lock:
+            self.raw.append((ts, temp, hum, gas, None))
+            for name, width in RESOLUTIONS.items():
+                self._bucket(name, int(ts // width * width)).add(values)
+            self.points += 1
+
+    def record_vibration(self, ts=None):
+        ts = time.time() if ts is None else ts
+
+        with self.lock:
+            self.raw.append((ts, None, None, None, 1))
+            for name, width in RESOLUTIONS.items():
+                self._bucket(name, int(ts // width * width)).vib += 1
+            self.points += 1
+
+    def _bucket(self, name, bucket):
+        buckets = self.buckets[name]
+        b = buckets.get(bucket)
+        if b is None:
+            b = buckets[bucket] = _Bucket()
+        return b
+
+    # ---------- storage ----------
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.raw:
+            return
+
+        raw, self.raw = self.raw, []
+        buckets, self.buckets = self.buckets, {name: {} for name in RESOLUTIONS}
+
+        with self.db:
+            self.db.executemany("INSERT INTO raw VALUES (?, ?, ?, ?, ?)", raw)
+            for name, rows in buckets.items():
+                self.db.executemany(
+                    self.upserts[name],
+                    [b.row(bucket) for bucket, b in rows.items()]
+                )
+
+            now = time.time()
+            if now - self.last_prune >= 3600:
+                self.db.execute("DELETE FROM raw WHERE ts < ?", (now - RAW_RETENTION,))
+                self.last_prune = now
+
+        self.flushes += 1
+
+    def run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print("❌ Sensor history flush error:", e)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    # ---------- queries ----------
+    def pick_resolution(self, start, end):
+        span = max(end - start, 0)
+        if span <= RAW_AUTO_SPAN:
+            return "raw"
+        for name, width in sorted(RESOLUTIONS.items(), key=lambda kv: kv[1]):
+            if span / width <= MAX_POINTS:
+                return name
+        return max(RESOLUTIONS, key=RESOLUTIONS.get)
+
+    def query(self, start, end, resolution="auto"):
+        """
+        Columnar history between start and end (unix seconds):
+            raw:   {"t": [...], "temp": [...], "hum": [...], "gas": [...], "vib": [...]}
+            1m/1h: {"t": [...], "temp": {"min": [...], "max": [...], "avg": [...]}, ...,
+                    "vib": [events per bucket]}
+        """
+        if resolution == "auto":
+            resolution = self.pick_resolution(start, end)
+        if resolution != "raw" and resolution not in RESOLUTIONS:
+            raise ValueError(f"unknown resolution {resolution!r}")
+
+        with self.lock:
+            self._flush()
+
+            if resolution == "raw":
+                rows = self.db.execute(
+                    f"SELECT ts, {', '.join(METRICS)}, vib FROM raw "
+                    "WHERE ts >= ? AND ts < ? ORDER BY ts",
+                    (start, end)
+                ).fetchall()
+            else:
+                width = RESOLUTIONS[resolution]
+                rows = self.db.execute(
+                    f"SELECT * FROM rollup_{resolution} "
+                    "WHERE bucket >= ? AND bucket < ? ORDER BY bucket",
+                    (start // width * width, end)
+                ).fetchall()
+
+        out = {"resolution": resolution, "from": start, "to": end}
+        width = len(METRICS) + 2 if resolution == "raw" else 3 * len(METRICS) + 3
+        columns = list(zip(*rows)) or [()] * width
+        out["t"] = list(columns[0])
+
+        if resolution == "raw":
+            for i, m in enumerate(METRICS, 1):
+                out[m] = list(columns[i])
+            out["vib"] = [v or 0 for v in columns[-1]]
+            return out
+
+        n = columns[1]
+        for i, m in enumerate(METRICS):
+            lo, hi, total = columns[2 + 3 * i: 5 + 3 * i]
+            out[m] = {
+                "min": list(lo),
+                "max": list(hi),
+                "avg": [s / c if c else None for s, c in zip(total, n)]
+            }
+        out["vib"] = list(columns[-1])
+        return out
+
+    def stats(self):
+        with self.lock:
+            return {
+                "points": self.points,
+                "pending": len(self.raw),
+                "flushes": self.flushes,
+                "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            }
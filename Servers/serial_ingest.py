@@ -0,0 +1,155 @@
+import time
+import threading
+import serial
+
+# ================= CONFIG =================
+SERIAL_READ_TIMEOUT = 0.05   # seconds a read waits for the first byte
+RECONNECT_DELAY = 1.0        # seconds, doubled per failed open
+RECONNECT_MAX = 30.0
+MAX_LINE = 256               # bytes without a newline before the buffer is dropped
+
+
+# ================= PARSER =================
+class LineParser:
+    """
+    Incremental framing of the Arduino protocol from a bytearray buffer:
+        R,angle,distance   → ("R", int, int)
+        S,temp,hum,gas     → ("S", float, float, int)
+        V,1                → ("V",)
+    Chunks may split lines anywhere; partial lines wait for the next feed().
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.bytes = 0
+        self.lines = 0
+        self.parse_errors = 0    # known tag, bad fields / overlong garbage
+        self.unknown = 0         # other lines ("SYSTEM READY", noise)
+
+    def feed(self, data):
+        self.bytes += len(data)
+        self.buffer += data
+
+        if b"\n" not in data:
+            if len(self.buffer) > MAX_LINE:
+                self.buffer.clear()
+                self.parse_errors += 1
+            return []
+
+        # complete lines out, the partial tail stays buffered
+        *complete, tail = self.buffer.split(b"\n")
+        self.buffer = bytearray(tail)
+
+        parse = self.parse
+        return [r for r in map(parse, complete) if r is not None]
+
+    def parse(self, line):
+        line = line.strip()
+        if not line:
+            return None
+
+        self.lines += 1
+        parts = line.split(b",")
+        tag = parts[0]
+
+        try:
+            if tag == b"R" and len(parts) == 3:
+                return ("R", int(parts[1]), int(parts[2]))
+            if tag == b"S" and len(parts) == 4:
+                return ("S", float(parts[1]), float(parts[2]), int(parts[3]))
+            if tag == b"V":
+                return ("V",)
+        except ValueError:
+            self.parse_errors += 1
+            return None
+
+        if tag in (b"R", b"S"):
+            self.parse_errors += 1
+        else:
+            self.unknown += 1
+        return None
+
+
+# ================= SERIAL INGEST =================
+class SerialIngest:
+    """
+    Bulk reader: in_waiting-sized reads fed to a LineParser, records handed
+    to on_record(record). Reconnects with backoff instead of sleeping after
+    every error; optionally tees raw bytes to a capture file for replay.
+    """
+
+    def __init__(self, port, baud, on_record, capture_path=None):
+        self.port = port
+        self.baud = baud
+        self.on_record = on_record
+        self.capture_path = capture_path
+
+        self.conn = None
+        self.parser = LineParser()
+        self.handler_errors = 0
+        self.reconnects = 0
+        self.line_rate = 0.0
+
+    def _open(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                conn = serial.Serial(self.port, self.baud, timeout=SERIAL_READ_TIMEOUT)
+                print(f"✅ Arduino connected on {self.port}")
+                return conn
+            except Exception as e:
+                print(f"⚠️ Arduino not connected ({self.port}), retry in {delay:.0f}s:", e)
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+
+    def run(self):
+        print("📡 Serial thread started")
+
+        capture = open(self.capture_path, "ab") if self.capture_path else None
+        rate_at, rate_lines = time.time(), 0
+
+        while True:
+            if self.conn is None:
+                self.conn = self._open()
+
+            try:
+                data = self.conn.read(self.conn.in_waiting or 1)
+            except (serial.SerialException, OSError) as e:
+                print("❌ Serial Error:", e)
+                self.conn.close()
+                self.conn = None
+                self.reconnects += 1
+                continue
+
+            now = time.time()
+            if now - rate_at >= 1.0:
+                self.line_rate = (self.parser.lines - rate_lines) / (now - rate_at)
+                rate_at, rate_lines = now, self.parser.lines
+
+            if not data:
+                continue
+
+            if capture:
+                capture.write(data)
+
+            for record in self.parser.feed(data):
+                try:
+                    self.on_record(record)
+                except Exception as e:
+                    self.handler_errors += 1
+                    print("❌ Serial handler error:", record, e)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stats(self):
+        return {
+            "connected": self.conn is not None,
+            "bytes": self.parser.bytes,
+            "lines": self.parser.lines,
+            "line_rate": round(self.line_rate, 1),
+            "parse_errors": self.parser.parse_errors,
+            "unknown_lines": self.parser.unknown,
+            "handler_errors": self.handler_errors,
+            "reconnects": self.reconnects
+        }
@@ -0,0 +1,45 @@
+import time
+import threading
+
+
+# ================= TIMER SCHEDULER =================
+class TimerScheduler:
+    """
+    One thread for every delayed callback. Scheduling a key that is already
+    pending moves its deadline, so a burst of events costs no new threads.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.deadlines = {}   # key → (due, fn)
+
+    def schedule(self, key, delay, fn):
+        with self.cond:
+            self.deadlines[key] = (time.monotonic() + delay, fn)
+            self.cond.notify()
+
+    def cancel(self, key):
+        with self.cond:
+            self.deadlines.pop(key, None)
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.deadlines:
+                    self.cond.wait()
+
+                key, (due, fn) = min(self.deadlines.items(), key=lambda kv: kv[1][0])
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+
+                del self.deadlines[key]
+
+            try:
+                fn()
+            except Exception as e:
+                print("❌ Timer error:", key, e)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
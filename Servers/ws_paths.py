@@ -0,0 +1,9 @@
+# ================= HANDSHAKE =================
+# shared by the camera server (ESPCAM/EspCam.py) and the door server
+# (doors.py); keep this module free of heavy imports
+
+
+def connection_path(ws):
+    # websockets >= 13 exposes the upgrade request, older versions ws.path
+    request = getattr(ws, "request", None)
+    return request.path if request is not None else ws.path
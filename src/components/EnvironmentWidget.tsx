@@ -19,6 +19,15 @@ interface ChartPoint {
 }
 
 const MAX_POINTS = 12;
+const SERVER_URL = "http://localhost:5000";
+const HISTORY_SECONDS = 600;
+
+interface RawHistory {
+  t: number[];
+  temp: (number | null)[];
+  hum: (number | null)[];
+  gas: (number | null)[];
+}
 
 export function EnvironmentWidget({
   temperature,
@@ -29,6 +38,31 @@ export function EnvironmentWidget({
   const [humidData, setHumidData] = useState<ChartPoint[]>([]);
   const [gasData, setGasData] = useState<ChartPoint[]>([]);
 
+  // ===== Seed charts from server history, so a refresh doesn't start empty =====
+  useEffect(() => {
+    const to = Date.now() / 1000;
+    const url = `${SERVER_URL}/api/sensors/history?from=${to - HISTORY_SECONDS}&to=${to}&resolution=raw`;
+
+    fetch(url)
+      .then((res) => res.json())
+      .then((h: RawHistory) => {
+        const points = (values: (number | null)[]) =>
+          h.t
+            .map((t, i) => ({
+              time: new Date(t * 1000).toLocaleTimeString().slice(0, 5),
+              val: values[i],
+            }))
+            .filter((p): p is ChartPoint => p.val !== null)
+            .slice(-MAX_POINTS);
+
+        // live points that arrived before the response stay at the end
+        setTempData((prev) => [...points(h.temp), ...prev].slice(-MAX_POINTS));
+        setHumidData((prev) => [...points(h.hum), ...prev].slice(-MAX_POINTS));
+        setGasData((prev) => [...points(h.gas), ...prev].slice(-MAX_POINTS));
+      })
+      .catch(() => {});
+  }, []);
+
   useEffect(() => {
     const now = new Date();
     const timeLabel = now.toLocaleTimeString().slice(0, 5);
@@ -2,18 +2,42 @@ import React, { useEffect, useRef } from "react";
 import { Video } from "lucide-react";
 import { Card } from "./ui/Card";
 
-const WS_URL = "ws://localhost:9876"; // عدّل حسب جهازك
+const WS_BASE = "ws://localhost:9876"; // عدّل حسب جهازك
 const RECONNECT_DELAY = 2000; // 2 ثواني
 
+interface FaceBox {
+  box: [number, number, number, number]; // top, right, bottom, left
+  name: string;
+}
+
 interface LiveCameraCardProps {
+  cameraId?: string;
   onStatusChange?: (status: "active" | "offline" | "reconnecting") => void;
 }
 
-export function LiveCameraCard({ onStatusChange }: LiveCameraCardProps) {
+export function LiveCameraCard({
+  cameraId = "cam_01",
+  onStatusChange
+}: LiveCameraCardProps) {
   const canvasRef = useRef<HTMLCanvasElement | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimerRef = useRef<number | null>(null);
   const mountedRef = useRef(true);
+  const facesRef = useRef<FaceBox[]>([]);
+
+  // boxes arrive as JSON metadata, frames are the camera's raw JPEG
+  const drawFaces = (ctx: CanvasRenderingContext2D) => {
+    ctx.strokeStyle = "#00ff00";
+    ctx.fillStyle = "#00ff00";
+    ctx.lineWidth = 2;
+    ctx.font = "16px sans-serif";
+
+    for (const { box, name } of facesRef.current) {
+      const [top, right, bottom, left] = box;
+      ctx.strokeRect(left, top, right - left, bottom - top);
+      ctx.fillText(name, left, top - 8);
+    }
+  };
 
   const connect = () => {
     if (!canvasRef.current) return;
@@ -21,7 +45,7 @@ export function LiveCameraCard({ onStatusChange }: LiveCameraCardProps) {
     console.log("📡 Connecting to Camera WebSocket...");
     onStatusChange?.("reconnecting");
 
-    const ws = new WebSocket(WS_URL);
+    const ws = new WebSocket(`${WS_BASE}/view/${cameraId}`);
     ws.binaryType = "arraybuffer";
     wsRef.current = ws;
 
@@ -34,6 +58,12 @@ export function LiveCameraCard({ onStatusChange }: LiveCameraCardProps) {
     };
 
     ws.onmessage = (event) => {
+      if (typeof event.data === "string") {
+        const msg = JSON.parse(event.data);
+        if (msg.type === "faces") facesRef.current = msg.faces;
+        return;
+      }
+
       const blob = new Blob([event.data], { type: "image/jpeg" });
       const img = new Image();
 
@@ -49,6 +79,7 @@ export function LiveCameraCard({ onStatusChange }: LiveCameraCardProps) {
         }
 
         ctx.drawImage(img, 0, 0);
+        drawFaces(ctx);
         URL.revokeObjectURL(img.src);
       };
 
@@ -95,7 +126,7 @@ export function LiveCameraCard({ onStatusChange }: LiveCameraCardProps) {
       </div>
 
       <div className="mt-2 text-xs text-slate-400 text-center">
-        Live Stream • ESP32-CAM
+        Live Stream • ESP32-CAM • {cameraId}
       </div>
     </Card>
   );
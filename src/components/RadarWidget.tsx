@@ -1,46 +1,47 @@
-import React, { useEffect, useRef, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import { motion } from "framer-motion";
 
 interface RadarWidgetProps {
-  angle: number;     // servo angle (15 → 165)
-  distance: number;  // ultrasonic cm
+  angle: number;        // servo angle (15 → 165) at the end of the last sweep
+  sweep: Uint16Array;   // latest distance (cm) per angle 0..180, 0 = no reading
 }
 
 interface Detection {
   id: number;
   x: number;
   y: number;
-  createdAt: number;
 }
 
 /* ===== CONFIG ===== */
-const DETECT_DELAY = 1000;      // 3 ثواني بين كل detect
-const FADE_TIME = 3000;         // fade out
 const MAX_DISTANCE_CM = 220;    // نصف الدايرة
 const MAX_DETECT_CM = 200;      // detection limit
 const MAX_RADIUS_UI = 50;       // آخر قوس (%)
 
-export function RadarWidget({ angle, distance }: RadarWidgetProps) {
-  const [detections, setDetections] = useState<Detection[]>([]);
-  const lastDetectRef = useRef(0);
-  const idRef = useRef(0);
-
+export function RadarWidget({ angle, sweep }: RadarWidgetProps) {
   /* ===== Servo → UI Mapping ===== */
   // Servo: 15 → 165
   // UI:   -90 → +90
   const scanRotation =
     ((angle - 15) / (165 - 15)) * 180 - 90;
 
-  /* ===== Detection Logic ===== */
+  // angle only changes once per revolution → animate the line over the
+  // time the last revolution took, so it sweeps instead of jumping
+  const lastAngleAtRef = useRef(Date.now());
+  const [sweepDuration, setSweepDuration] = useState(0.015);
+
   useEffect(() => {
     const now = Date.now();
+    setSweepDuration(Math.min((now - lastAngleAtRef.current) / 1000, 5));
+    lastAngleAtRef.current = now;
+  }, [angle]);
+
+  /* ===== Detection Logic ===== */
+  // every angle of the sweep with an object in range is a dot
+  const detections = useMemo(() => {
+    const points: Detection[] = [];
 
-    if (
-      distance > 0 &&
-      distance <= MAX_DETECT_CM &&
-      now - lastDetectRef.current >= DETECT_DELAY
-    ) {
-      lastDetectRef.current = now;
+    sweep.forEach((distance, a) => {
+      if (distance <= 0 || distance > MAX_DETECT_CM) return;
 
       const clamped = Math.min(distance, MAX_DISTANCE_CM);
 
@@ -48,34 +49,17 @@ export function RadarWidget({ angle, distance }: RadarWidgetProps) {
       const radius =
         (clamped / MAX_DISTANCE_CM) * MAX_RADIUS_UI;
 
-      const angleRad = (angle * Math.PI) / 180;
+      const angleRad = (a * Math.PI) / 180;
 
-      const x = 50 + radius * Math.cos(Math.PI - angleRad);
-      const y = 100 - radius * Math.sin(angleRad);
+      points.push({
+        id: a,
+        x: 50 + radius * Math.cos(Math.PI - angleRad),
+        y: 100 - radius * Math.sin(angleRad),
+      });
+    });
 
-      setDetections(prev => [
-        ...prev,
-        {
-          id: idRef.current++,
-          x,
-          y,
-          createdAt: now,
-        },
-      ]);
-    }
-  }, [angle, distance]);
-
-  /* ===== Fade Cleanup ===== */
-  useEffect(() => {
-    const interval = setInterval(() => {
-      const now = Date.now();
-      setDetections(prev =>
-        prev.filter(d => now - d.createdAt < FADE_TIME)
-      );
-    }, 100);
-
-    return () => clearInterval(interval);
-  }, []);
+    return points;
+  }, [sweep]);
 
   return (
     <div className="relative w-full max-w-md mx-auto">
@@ -110,7 +94,7 @@ export function RadarWidget({ angle, distance }: RadarWidgetProps) {
               w-px h-full bg-cyan-400
             "
             animate={{ rotate: scanRotation }}
-            transition={{ duration: 0.015, ease: "linear" }}
+            transition={{ duration: sweepDuration, ease: "linear" }}
             style={{
               boxShadow: "0 0 25px rgba(34,211,238,0.9)",
             }}
@@ -120,7 +104,7 @@ export function RadarWidget({ angle, distance }: RadarWidgetProps) {
           <motion.div
             className="absolute bottom-0 left-1/2 origin-bottom w-full h-full"
             animate={{ rotate: scanRotation }}
-            transition={{ duration: 0.015, ease: "linear" }}
+            transition={{ duration: sweepDuration, ease: "linear" }}
           >
             <div
               className="
@@ -137,9 +121,6 @@ export function RadarWidget({ angle, distance }: RadarWidgetProps) {
 
           {/* ===== DETECTIONS ===== */}
           {detections.map(d => {
-            const age = Date.now() - d.createdAt;
-            const opacity = 1 - age / FADE_TIME;
-
             return (
               <div
                 key={d.id}
@@ -147,7 +128,6 @@ export function RadarWidget({ angle, distance }: RadarWidgetProps) {
                 style={{
                   left: `${d.x}%`,
                   top: `${d.y}%`,
-                  opacity,
                 }}
               >
                 {/* DOT */}
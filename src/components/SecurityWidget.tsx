@@ -185,7 +185,7 @@ export function SecurityWidget({ cameraStatus }: SecurityWidgetProps) {
               >
                 <div className="flex gap-3 items-center">
                   <img
-                    src={`${SERVER_URL}${face.image_url}?t=${face.time}`}
+                    src={`${SERVER_URL}${face.image_url}?w=128`}
                     className="w-10 h-10 rounded-md object-cover border border-slate-700"
                   />
 
@@ -26,8 +26,27 @@ interface ServerData {
     };
 }
 
+const RADAR_ANGLES = 181;
+
+// binary sweep frame: start, end, angle, flags (u8) + seq (u32 LE)
+// followed by one u16 LE distance per angle in [start, end]
+function applySweepFrame(prev: Uint16Array, buf: ArrayBuffer): Uint16Array {
+    const view = new DataView(buf);
+    const start = view.getUint8(0);
+    const end = view.getUint8(1);
+
+    const next = new Uint16Array(prev);
+    for (let a = start; a <= end && a < RADAR_ANGLES; a++) {
+        next[a] = view.getUint16(8 + (a - start) * 2, true);
+    }
+    return next;
+}
+
 export function Dashboard() {
     const [data, setData] = useState<ServerData | null>(null);
+    const [sweep, setSweep] = useState<Uint16Array>(
+        () => new Uint16Array(RADAR_ANGLES)
+    );
     const [lastUpdate, setLastUpdate] = useState("--:--:--");
 
     // ===== vibration state =====
@@ -44,11 +63,24 @@ export function Dashboard() {
 
     // ================= SOCKET =================
     useEffect(() => {
-        const onUpdate = (serverData: ServerData) => {
-            setData(serverData);
+        // first message is the full state, later ones only changed fields
+        const onUpdate = (delta: Partial<{
+            radar: Partial<ServerData["radar"]>;
+            sensors: Partial<ServerData["sensors"]>;
+        }>) => {
+            setData(prev => {
+                const base: ServerData = prev ?? {
+                    radar: { angle: 0, distance: 0 },
+                    sensors: { temp: 0, hum: 0, gas: 0, vib: 0 }
+                };
+                return {
+                    radar: { ...base.radar, ...delta.radar },
+                    sensors: { ...base.sensors, ...delta.sensors }
+                };
+            });
             setLastUpdate(new Date().toLocaleTimeString());
 
-            if (serverData.sensors.vib === 1) {
+            if (delta.sensors?.vib === 1) {
                 setVibrationActive(true);
 
                 if (vibTimeoutRef.current) {
@@ -67,11 +99,17 @@ export function Dashboard() {
             setLastNfcEvent(data);
         };
 
+        const onRadarSweep = (buf: ArrayBuffer) => {
+            setSweep(prev => applySweepFrame(prev, buf));
+        };
+
         socket.on("update", onUpdate);
+        socket.on("radar_sweep", onRadarSweep);
         socket.on("nfc_event", onNfcEvent);
 
         return () => {
             socket.off("update", onUpdate);
+            socket.off("radar_sweep", onRadarSweep);
             socket.off("nfc_event", onNfcEvent);
             if (vibTimeoutRef.current) clearTimeout(vibTimeoutRef.current);
         };
@@ -145,7 +183,7 @@ export function Dashboard() {
                                 <div className="flex-1 flex items-center justify-center py-6">
                                     <RadarWidget
                                         angle={data.radar.angle}
-                                        distance={data.radar.distance}
+                                        sweep={sweep}
                                     />
                                 </div>
 